@@ -1,4 +1,10 @@
-from aiosqlite import Connection, connect
+import os
+from contextlib import AbstractAsyncContextManager
+from typing import Optional
+
+import click
+from aiosqlite import Connection
+from jinja2 import FileSystemBytecodeCache, ModuleLoader
 from quart import (
     Quart,
     ResponseReturnValue,
@@ -11,49 +17,103 @@ from quart import (
 
 from .data import Metadata
 from .db import (
+    Pool,
     add_post,
     count_posts,
-    get_metadata,
+    get_metadata_or_none,
     get_post,
-    get_posts,
+    get_posts_page,
     has_initialized,
     initialize,
 )
-from .federation import CtxData, server
+from .federation import (
+    CtxData,
+    cache_actor_documents,
+    invalidate_actor_cache,
+    server,
+)
 
 __all__ = ["app"]
 
 app = Quart(__name__)
 app.config.from_prefixed_env("FEDIBLOG")
-app.asgi_app = server.asgi(  # type: ignore
-    CtxData(app),
-    on_non_http=app.asgi_app,
-    on_not_found=app.asgi_app,
-    on_method_not_allowed=app.asgi_app,
-    on_not_acceptable=app.asgi_app,
+app.asgi_app = cache_actor_documents(  # type: ignore
+    server.asgi(
+        CtxData(app),
+        on_non_http=app.asgi_app,
+        on_not_found=app.asgi_app,
+        on_method_not_allowed=app.asgi_app,
+        on_not_acceptable=app.asgi_app,
+    )
 )
 
+if app.config.get("COMPILED_TEMPLATES_PATH"):
+    # Load the templates precompiled by the compile-templates command as
+    # Python modules, instead of parsing and compiling them at runtime:
+    app.jinja_env.loader = ModuleLoader(app.config["COMPILED_TEMPLATES_PATH"])
+elif app.config.get("TEMPLATE_CACHE_PATH"):
+    # Otherwise, keep the bytecode of compiled templates on disk, so that
+    # restarted processes do not have to compile them again:
+    os.makedirs(app.config["TEMPLATE_CACHE_PATH"], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+        app.config["TEMPLATE_CACHE_PATH"]
+    )
+
+
+@app.cli.command("compile-templates")
+@click.argument("target", required=False)
+def compile_templates(target: Optional[str]) -> None:
+    """Compile the templates ahead of time into the TARGET directory, which
+    defaults to the FEDIBLOG_COMPILED_TEMPLATES_PATH.
+    """
+    target = target or app.config.get("COMPILED_TEMPLATES_PATH")
+    if not target:
+        raise click.UsageError(
+            "Missing TARGET or FEDIBLOG_COMPILED_TEMPLATES_PATH."
+        )
+    # Compile from the template sources, even if the templates are configured
+    # to be loaded from the TARGET directory:
+    env = app.jinja_env.overlay(loader=app.jinja_loader)
+    env.compile_templates(target, zip=None, ignore_errors=False)
+
+
+@app.before_serving
+async def open_db_pool() -> None:
+    pool = Pool(
+        app.config["DATABASE_PATH"],
+        readers=app.config.get("DATABASE_READERS", 4),
+    )
+    await pool.open()
+    app.config["DATABASE_POOL"] = pool
+    # Seed the in-memory post count before any post is added:
+    async with pool.acquire() as db:
+        if await has_initialized(db):
+            await count_posts(db)
+
+
+@app.after_serving
+async def close_db_pool() -> None:
+    await app.config["DATABASE_POOL"].close()
+
 
-def connect_db() -> Connection:
-    return connect(current_app.config["DATABASE_PATH"])
+def connect_db(write: bool = False) -> AbstractAsyncContextManager[Connection]:
+    return current_app.config["DATABASE_POOL"].acquire(write)
 
 
 @app.route("/")
 async def index() -> ResponseReturnValue:
     async with connect_db() as db:
-        if not await has_initialized(db):
+        metadata = await get_metadata_or_none(db)
+        if metadata is None:
             return redirect(url_for("setup"))
-        metadata = await get_metadata(db)
-        offset = request.args.get("offset", 0, int)
-        limit = 5
-        total = await count_posts(db)
-        posts = [post async for post in get_posts(db, offset, limit)]
+        before = request.args.get("before", None, int)
+        posts, prev_id, next_id = await get_posts_page(db, before, 5)
         prev = (
             None
-            if offset < 1
-            else ({"offset": offset - limit} if offset > limit else {})
+            if before is None
+            else ({} if prev_id is None else {"before": prev_id})
         )
-        next_ = {"offset": offset + limit} if offset + limit < total else None
+        next_ = None if next_id is None else {"before": next_id}
         return await render_template(
             "index.html", metadata=metadata, posts=posts, prev=prev, next=next_
         )
@@ -61,21 +121,20 @@ async def index() -> ResponseReturnValue:
 
 @app.route("/posts/", methods=["POST"])
 async def do_add_post() -> ResponseReturnValue:
-    async with connect_db() as db:
+    async with connect_db(write=True) as db:
         if not await has_initialized(db):
             return redirect(url_for("setup"))
         form = await request.form
         await add_post(db, form["content"])
-        await db.commit()
         return redirect(url_for("index"), 303)
 
 
 @app.route("/posts/<int:post_id>/")
 async def show_post(post_id: int) -> ResponseReturnValue:
     async with connect_db() as db:
-        if not await has_initialized(db):
+        metadata = await get_metadata_or_none(db)
+        if metadata is None:
             return redirect(url_for("setup"))
-        metadata = await get_metadata(db)
         post = await get_post(db, post_id)
         return await render_template("post.html", metadata=metadata, post=post)
 
@@ -96,8 +155,8 @@ async def do_setup() -> ResponseReturnValue:
         title=form["title"],
         description=form["description"],
     )
-    async with connect_db() as db:
+    async with connect_db(write=True) as db:
         if not await has_initialized(db):
             await initialize(db, metadata)
-            await db.commit()
+            invalidate_actor_cache()
         return redirect(url_for("index"), 303)
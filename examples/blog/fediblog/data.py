@@ -4,19 +4,19 @@ from datetime import datetime
 __all__ = ["Metadata", "MetadataWithCreated", "Post"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Metadata:
     handle: str
     title: str
     description: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MetadataWithCreated(Metadata):
     created: datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Post:
     id: int
     content: str
@@ -1,106 +1,298 @@
-from collections.abc import AsyncIterable
-from datetime import datetime
-from typing import Optional, cast
+from asyncio import Lock, Queue
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Final, Optional, cast
 
-from aiosqlite import Connection
+from aiosqlite import Connection, connect
 
 from .data import Metadata, MetadataWithCreated, Post
 
 __all__ = [
+    "Pool",
     "add_post",
     "count_posts",
     "get_metadata",
+    "get_metadata_or_none",
     "get_post",
-    "get_posts",
+    "get_post_id_after",
+    "get_posts_page",
     "has_initialized",
     "initialize",
 ]
 
 
+#: PRAGMAs run on every pooled connection when it is opened.
+PRAGMAS: Final[tuple[str, ...]] = (
+    # The page size only takes effect on a new database, and cannot be changed
+    # once it is in WAL mode, so it has to be set first:
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    # Read pages through a memory map instead of read() system calls:
+    "PRAGMA mmap_size=268435456",
+)
+
+
+HAS_INITIALIZED_SQL: Final[str] = """
+    SELECT count(*)
+    FROM sqlite_schema
+    WHERE type = 'table' AND name IN ('metadata', 'posts')
+"""
+
+# Both tables are created in a single executescript() call.  Since
+# executescript() does not begin a transaction by itself, the script does so,
+# so that the tables are committed together with the metadata row inserted
+# right after:
+CREATE_TABLES_SQL: Final[str] = """
+    BEGIN;
+    CREATE TABLE metadata (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        handle TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content TEXT NOT NULL,
+        published TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+INSERT_METADATA_SQL: Final[str] = """
+    INSERT INTO metadata (id, handle, title, description)
+    VALUES (1, ?, ?, ?)
+"""
+
+GET_METADATA_SQL: Final[str] = (
+    "SELECT handle, title, description, created FROM metadata WHERE id = 1"
+)
+
+ADD_POST_SQL: Final[str] = "INSERT INTO posts (content) VALUES (?)"
+
+# Seeking by id (instead of OFFSET) lets SQLite start right at the first row of
+# the page.  Note that coalesce() is used instead of "? IS NULL OR id < ?"
+# since the latter makes SQLite scan the table.  The previous page is looked up
+# by an uncorrelated subquery, which SQLite evaluates only once, and one more
+# post than requested is fetched to tell whether there is a next page:
+GET_POSTS_PAGE_SQL: Final[str] = """
+    SELECT
+        id, content, published,
+        (
+            SELECT id FROM posts WHERE id >= ?1
+            ORDER BY id ASC LIMIT 1 OFFSET ?2
+        )
+    FROM posts
+    WHERE id < coalesce(?1, 9223372036854775807)
+    ORDER BY id DESC LIMIT ?2 + 1
+"""
+
+# Counts from the given id itself, so that offset=1 is the next newer post:
+GET_POST_ID_AFTER_SQL: Final[str] = (
+    "SELECT id FROM posts WHERE id >= ? ORDER BY id ASC LIMIT 1 OFFSET ?"
+)
+
+GET_POST_SQL: Final[str] = "SELECT content, published FROM posts WHERE id = ?"
+
+COUNT_POSTS_SQL: Final[str] = "SELECT count(*) FROM posts"
+
+
+class Pool:
+    """A bounded pool of SQLite connections: a single writer connection and
+    a fixed number of reader connections, all opened up front.
+    """
+
+    path: str
+    readers: int
+    _readers: Queue[Connection]
+    _writer: Queue[Connection]
+
+    def __init__(self, path: str, readers: int = 4) -> None:
+        self.path = path
+        self.readers = readers
+        self._readers = Queue(readers)
+        self._writer = Queue(1)
+
+    async def _connect(self) -> Connection:
+        # Since the connections outlive requests, each of the *_SQL statements
+        # above is parsed and planned by SQLite only once per connection, and
+        # then reused from sqlite3's statement cache (keyed by SQL text):
+        db = await connect(self.path)
+        for pragma in PRAGMAS:
+            await db.execute(pragma)
+        return db
+
+    async def open(self) -> None:
+        """Open the writer connection and all reader connections."""
+        # The writer goes first so that it is the one to switch the database
+        # into WAL mode:
+        self._writer.put_nowait(await self._connect())
+        for _ in range(self.readers):
+            self._readers.put_nowait(await self._connect())
+
+    async def close(self) -> None:
+        """Close all connections.  Connections checked out at the moment are
+        not waited for.
+        """
+        for queue in (self._readers, self._writer):
+            while not queue.empty():
+                await queue.get_nowait().close()
+
+    @asynccontextmanager
+    async def acquire(self, write: bool = False) -> AsyncIterator[Connection]:
+        """Check out a connection and return it to the pool on exit.
+
+        :param write: Check out the writer connection instead of a reader.
+        """
+        queue = self._writer if write else self._readers
+        db = await queue.get()
+        try:
+            yield db
+        finally:
+            if db.in_transaction:
+                await db.rollback()
+            queue.put_nowait(db)
+
+
+# Once the tables are created they are never dropped, so the answer of
+# has_initialized() is remembered (per process) as soon as it becomes True:
+_initialized: bool = False
+
+
 async def has_initialized(db: Connection) -> bool:
-    cursor = await db.execute("""
-        SELECT count(*)
-        FROM sqlite_schema
-        WHERE type = 'table' AND name IN ('metadata', 'posts')
-    """)
-    async with cursor:
-        row = await cursor.fetchone()
-        return row is not None and row[0] == 2
+    global _initialized
+    if _initialized:
+        return True
+    (row,) = await db.execute_fetchall(HAS_INITIALIZED_SQL)
+    _initialized = row[0] == 2
+    return _initialized
 
 
 async def initialize(db: Connection, metadata: Metadata) -> None:
-    await db.execute("""
-        CREATE TABLE metadata (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            handle TEXT NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT NOT NULL,
-            created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    await db.execute("""
-        CREATE TABLE posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT NOT NULL,
-            published TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    """Create the tables and store the metadata, and commit them.
+
+    The cached answers of :func:`has_initialized` and :func:`count_posts` are
+    updated only once the commit succeeds, so that a failed setup leaves them
+    as they were.
+    """
+    global _initialized, _post_count
+    await db.executescript(CREATE_TABLES_SQL)
     await db.execute(
-        """
-        INSERT INTO metadata (id, handle, title, description)
-        VALUES (1, ?, ?, ?)
-        """,
+        INSERT_METADATA_SQL,
         (metadata.handle, metadata.title, metadata.description),
     )
+    await db.commit()
+    _initialized = True
+    _post_count = 0
 
 
 async def get_metadata(db: Connection) -> MetadataWithCreated:
-    cursor = await db.execute(
-        "SELECT handle, title, description, created FROM metadata"
-    )
-    async with cursor:
-        row = await cursor.fetchone()
-        if row is None:
-            raise RuntimeError("metadata not found")
+    metadata = await get_metadata_or_none(db)
+    if metadata is None:
+        raise RuntimeError("metadata not found")
+    return metadata
+
+
+async def get_metadata_or_none(
+    db: Connection,
+) -> Optional[MetadataWithCreated]:
+    """Return the metadata, or ``None`` if the blog has not been set up yet.
+
+    Once the blog is set up, this takes a single query, unlike calling
+    :func:`has_initialized` and then :func:`get_metadata`.
+    """
+    # The tables have to be probed only until the blog is set up; after that
+    # has_initialized() returns without touching the database:
+    if not await has_initialized(db):
+        return None
+    for row in await db.execute_fetchall(GET_METADATA_SQL):
         return MetadataWithCreated(
-            row[0], row[1], row[2], datetime.fromisoformat(row[3] + "Z")
+            row[0],
+            row[1],
+            row[2],
+            datetime.fromisoformat(row[3]).replace(tzinfo=UTC),
         )
+    return None
 
 
 async def add_post(db: Connection, content: str) -> None:
-    await db.execute("INSERT INTO posts (content) VALUES (?)", (content,))
+    """Insert a post and commit it.
 
+    The cached count of :func:`count_posts` is bumped only once the commit
+    succeeds, so that a rolled back post is not counted.
+    """
+    global _post_count
+    await db.execute(ADD_POST_SQL, (content,))
+    await db.commit()
+    async with _post_count_lock:
+        if _post_count is not None:
+            _post_count += 1
 
-async def get_posts(
+
+async def get_posts_page(
     db: Connection,
-    offset: int = 0,
+    before_id: Optional[int] = None,
     limit: int = 5,
-) -> AsyncIterable[Post]:
-    cursor = await db.execute(
-        """
-        SELECT id, content, published FROM posts
-        ORDER BY id DESC LIMIT ?, ?
-        """,
-        (offset, limit),
+) -> tuple[list[Post], Optional[int], Optional[int]]:
+    """Return a page of posts older than ``before_id``, and the ids that
+    the previous and the next pages' posts are older than (``None`` if the
+    previous page is the first one or there is no such page).
+    """
+    rows = list(
+        await db.execute_fetchall(GET_POSTS_PAGE_SQL, (before_id, limit))
     )
-    async with cursor:
-        async for row in cursor:
-            yield Post(row[0], row[1], datetime.fromisoformat(row[2] + "Z"))
+    posts = [
+        Post(
+            row[0], row[1], datetime.fromisoformat(row[2]).replace(tzinfo=UTC)
+        )
+        for row in rows[:limit]
+    ]
+    prev_id = rows[0][3] if rows else None
+    next_id = posts[-1].id if len(rows) > limit else None
+    return posts, prev_id, next_id
+
+
+async def get_post_id_after(
+    db: Connection, post_id: int, offset: int
+) -> Optional[int]:
+    for row in await db.execute_fetchall(
+        GET_POST_ID_AFTER_SQL, (post_id, offset)
+    ):
+        return cast(int, row[0])
+    return None
 
 
 async def get_post(db: Connection, post_id: int) -> Optional[Post]:
-    cursor = await db.execute(
-        "SELECT content, published FROM posts WHERE id = ?",
-        (post_id,),
-    )
-    async with cursor:
-        async for row in cursor:
-            return Post(post_id, row[0], datetime.fromisoformat(row[1] + "Z"))
+    for row in await db.execute_fetchall(GET_POST_SQL, (post_id,)):
+        return Post(
+            post_id, row[0], datetime.fromisoformat(row[1]).replace(tzinfo=UTC)
+        )
     return None
 
 
+# The number of posts is counted once by count_posts() and then kept up to date
+# by add_post(), so that it is not counted again on every request:
+_post_count: Optional[int] = None
+_post_count_lock = Lock()
+
+
 async def count_posts(db: Connection) -> int:
-    cursor = await db.execute("SELECT count(*) FROM posts")
-    async with cursor:
-        row = await cursor.fetchone()
-        return 0 if row is None else cast(int, row[0])
+    """Return the number of posts.
+
+    The count is cached per process, and kept up to date only by
+    :func:`add_post` calls in the same process.  If more than one worker
+    process writes to the same database, the count drifts, so run a single
+    worker or drop the cache.
+    """
+    global _post_count
+    if _post_count is not None:
+        return _post_count
+    async with _post_count_lock:
+        if _post_count is None:
+            (row,) = await db.execute_fetchall(COUNT_POSTS_SQL)
+            _post_count = cast(int, row[0])
+        return _post_count
@@ -1,20 +1,56 @@
-from collections.abc import Mapping
+import re
+from asyncio import gather
+from collections.abc import Iterable, Mapping
+from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass
+from functools import cached_property
+from hashlib import sha1
 from html import escape
 from typing import Any, Final, Optional
 
-from aiosqlite import Connection, connect
+from aiosqlite import Connection
 from fedikit.federation.collection import Page
-from fedikit.federation.server import Context, Request, Server
+from fedikit.federation.server import (
+    AsgiApp,
+    Context,
+    Request,
+    Server,
+    is_acceptable,
+)
 from fedikit.model.entity import EntityRef
 from fedikit.uri import Uri
 from fedikit.vocab import Activity, Actor, Create, Note, Person
+from hypercorn.typing import (
+    ASGIReceiveCallable,
+    ASGISendCallable,
+    ASGISendEvent,
+    Scope,
+)
 from quart import Quart
 from quart import Request as QRequest
+from werkzeug.datastructures import Headers, MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
 
-from .db import count_posts, get_metadata, get_posts
+from .data import MetadataWithCreated, Post
+from .db import (
+    count_posts,
+    get_metadata,
+    get_post_id_after,
+    get_posts_page,
+)
 
-__all__ = ["CtxData", "server"]
+__all__ = [
+    "CtxData",
+    "cache_actor_documents",
+    "invalidate_actor_cache",
+    "server",
+]
+
+
+# Matches integer variables in URL rules, e.g., <int:post_id>:
+INT_RULE_VARIABLE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"<int:([A-Za-z_][A-Za-z0-9_]*)>"
+)
 
 
 @dataclass(frozen=True)
@@ -25,7 +61,55 @@ class CtxData:
     def config(self) -> Mapping[str, Any]:
         return self.app.config
 
+    @cached_property
+    def url_templates(self) -> Mapping[str, tuple[str, frozenset[str]]]:
+        """The path templates (for :meth:`str.format`) and their variable
+        names of the endpoints that can be built without Werkzeug, i.e., the
+        ones having a single rule with only integer variables.
+        """
+        rules: dict[str, list[str]] = {}
+        for rule in self.app.url_map.iter_rules():
+            rules.setdefault(rule.endpoint, []).append(rule.rule)
+        templates: dict[str, tuple[str, frozenset[str]]] = {}
+        for endpoint, endpoint_rules in rules.items():
+            if len(endpoint_rules) != 1:
+                continue
+            (path,) = endpoint_rules
+            template = INT_RULE_VARIABLE_PATTERN.sub(
+                r"{\1}", path.replace("{", "{{").replace("}", "}}")
+            )
+            if "<" not in template:
+                templates[endpoint] = (
+                    template,
+                    frozenset(INT_RULE_VARIABLE_PATTERN.findall(path)),
+                )
+        return templates
+
     async def url_for(self, request: Request, name: str, **kwargs: Any) -> Uri:
+        (url,) = await self.url_for_many(request, name, [kwargs])
+        return url
+
+    async def url_for_many(
+        self,
+        request: Request,
+        name: str,
+        kwargs_list: Iterable[Mapping[str, Any]],
+    ) -> list[Uri]:
+        kwargs_list = list(kwargs_list)
+        # Build the URLs by formatting the path template, if possible, which is
+        # much cheaper than entering a request context to let Werkzeug do it:
+        template = self.url_templates.get(name)
+        if template is not None and all(
+            kwargs.keys() == template[1]
+            and all(type(v) is int for v in kwargs.values())
+            for kwargs in kwargs_list
+        ):
+            base = request.root_url.rstrip("/")
+            return [
+                Uri(base + template[0].format(**kwargs))
+                for kwargs in kwargs_list
+            ]
+
         async def void(_: Any, __: Any) -> None:
             return None
 
@@ -40,32 +124,161 @@ class CtxData:
             {"type": "http"},  # type: ignore
             send_push_promise=void,
         )
+        # Enter the request context only once for all the URLs:
         async with self.app.request_context(qr):
-            return Uri(self.app.url_for(name, **kwargs, _external=True))
+            return [
+                Uri(self.app.url_for(name, **kwargs, _external=True))
+                for kwargs in kwargs_list
+            ]
 
-    def connect_db(self) -> Connection:
-        return connect(self.config["DATABASE_PATH"])
+    def connect_db(self) -> AbstractAsyncContextManager[Connection]:
+        return self.config["DATABASE_POOL"].acquire()
 
 
 server = Server[CtxData]()
 
 
+# The blog's metadata is set up only once, so the actor built from it is
+# cached per handle until invalidate_actor_cache() is called.  The actor's id
+# depends on the requested host too, so a cached actor is reused only if its
+# id matches:
+_actor_cache: dict[str, Person] = {}
+
+
+def invalidate_actor_cache() -> None:
+    _actor_cache.clear()
+    _actor_documents.clear()
+
+
 @server.actor_dispatcher("/actors/<handle>/")
 async def dispatch_actor(
     context: Context[CtxData], handle: str
 ) -> Optional[Actor]:
+    actor_uri = context.actor_uri(handle)
+    actor = _actor_cache.get(handle)
+    if actor is not None and actor.id == actor_uri:
+        return actor
     async with context.data.connect_db() as db:
         metadata = await get_metadata(db)
-        if metadata.handle != handle:
-            return None
-        return Person(
-            id=context.actor_uri(handle),
-            preferred_username=metadata.handle,
-            name=metadata.title,
-            summary=f"<p>{escape(metadata.description)}</p>",
-            published=metadata.created,
-            outbox=EntityRef(context.outbox_uri(handle)),
+    if metadata.handle != handle:
+        return None
+    actor = Person(
+        id=actor_uri,
+        preferred_username=metadata.handle,
+        name=metadata.title,
+        summary=f"<p>{escape(metadata.description)}</p>",
+        published=metadata.created,
+        outbox=EntityRef(context.outbox_uri(handle)),
+    )
+    _actor_cache[handle] = actor
+    return actor
+
+
+ACTOR_PATH_PATTERN: Final[re.Pattern[str]] = re.compile(r"^/actors/[^/]+/$")
+
+# Serialised actor documents, keyed by path, along with the origin they were
+# served for, their response headers, and their ETags.  Like _actor_cache,
+# they are reused only for the same origin, and invalidated together:
+_actor_documents: dict[
+    str,
+    tuple[
+        tuple[str, Optional[str], Optional[tuple[str, Optional[int]]]],
+        list[tuple[bytes, bytes]],
+        bytes,
+        str,
+    ],
+] = {}
+
+
+def cache_actor_documents(app: AsgiApp) -> AsgiApp:
+    """Wrap the given ASGI application so that the actor documents it serves
+    are kept as serialised bytes and served again verbatim, without building
+    and rendering the actor, until :func:`invalidate_actor_cache` is called.
+    The cached documents are served with an ``ETag``, and ``If-None-Match``
+    requests are answered with 304 Not Modified.
+    """
+
+    async def wrapper(
+        scope: Scope, receive: ASGIReceiveCallable, send: ASGISendCallable
+    ) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not ACTOR_PATH_PATTERN.match(
+                scope["path"][len(scope["root_path"]) :]
+            )
+        ):
+            return await app(scope, receive, send)
+        headers = Headers(
+            (k.decode("latin-1"), v.decode("latin-1"))
+            for k, v in scope["headers"]
         )
+        # Requests for HTML pages are not served by the federation server.
+        # The same negotiation as the server's is used, so that whether a
+        # request is served from the cache does not depend on the cache:
+        if not is_acceptable(
+            parse_accept_header(headers.get("Accept"), MIMEAccept)
+        ):
+            return await app(scope, receive, send)
+        path = scope["path"]
+        origin = (scope["scheme"], headers.get("Host"), scope["server"])
+        cached = _actor_documents.get(path)
+        if cached is None or cached[0] != origin:
+            messages: list[ASGISendEvent] = []
+
+            async def buffer(message: ASGISendEvent) -> None:
+                messages.append(message)
+
+            await app(scope, receive, buffer)
+            start = messages[0] if messages else None
+            if (
+                start is None
+                or start["type"] != "http.response.start"
+                or start["status"] != 200
+            ):
+                for message in messages:
+                    await send(message)
+                return
+            body = b"".join(
+                message["body"]
+                for message in messages
+                if message["type"] == "http.response.body"
+            )
+            cached = (
+                origin,
+                list(start["headers"]),
+                body,
+                sha1(body).hexdigest(),
+            )
+            _actor_documents[path] = cached
+        _, response_headers, body, etag = cached
+        etag_header = (b"etag", quote_etag(etag).encode("ascii"))
+        # The same path is served as an HTML page for other Accept headers:
+        vary_header = (b"vary", b"Accept")
+        if parse_etags(headers.get("If-None-Match")).contains_weak(etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [etag_header, vary_header],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b"",
+                "more_body": False,
+            })
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [*response_headers, etag_header, vary_header],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": body,
+            "more_body": False,
+        })
+
+    return wrapper
 
 
 PAGE_WINDOW: Final[int] = 5
@@ -77,38 +290,52 @@ async def dispatch_outbox(
 ) -> Optional[Page[Activity]]:
     if cursor is None:
         return None
-    offset = int(cursor)
-    async with context.data.connect_db() as db:
-        metadata = await get_metadata(db)
-        if metadata.handle != handle:
-            return None
-        activities: list[Activity] = []
-        async for post in get_posts(db, offset=offset, limit=PAGE_WINDOW):
-            activity = Create(
-                actor=EntityRef(context.actor_uri(handle)),
-                object=Note(
-                    content=post.content,
-                    published=post.published,
-                    url=await context.data.url_for(
-                        context.request, "show_post", post_id=post.id
-                    ),
-                ),
-            )
-            activities.append(activity)
-        total = await count_posts(db)
-        return Page(
-            prev_cursor=(
-                None
-                if offset < 1
-                else str(offset - PAGE_WINDOW if offset > PAGE_WINDOW else 0)
-            ),
-            next_cursor=(
-                str(offset + PAGE_WINDOW)
-                if offset + PAGE_WINDOW < total
-                else None
+    # A cursor is the id that all posts in the page are older than, or an empty
+    # string for the first page:
+    before = int(cursor) if cursor else None
+
+    async def fetch_metadata() -> MetadataWithCreated:
+        async with context.data.connect_db() as db:
+            return await get_metadata(db)
+
+    async def fetch_page() -> tuple[list[Post], Optional[int], Optional[int]]:
+        async with context.data.connect_db() as db:
+            return await get_posts_page(db, before, PAGE_WINDOW)
+
+    # The metadata and the posts are read concurrently on separate reader
+    # connections; the page is simply discarded if the handle does not match:
+    metadata, (posts, prev_id, next_id) = await gather(
+        fetch_metadata(), fetch_page()
+    )
+    if metadata.handle != handle:
+        return None
+    urls = await context.data.url_for_many(
+        context.request,
+        "show_post",
+        [{"post_id": post.id} for post in posts],
+    )
+    # All activities in the page share the same actor reference:
+    actor = EntityRef(context.actor_uri(handle))
+    activities: list[Activity] = [
+        Create(
+            actor=actor,
+            object=Note(
+                content=post.content,
+                published=post.published,
+                url=url,
             ),
-            items=activities,
         )
+        for post, url in zip(posts, urls)
+    ]
+    return Page(
+        prev_cursor=(
+            None
+            if before is None
+            else ("" if prev_id is None else str(prev_id))
+        ),
+        next_cursor=None if next_id is None else str(next_id),
+        items=activities,
+    )
 
 
 @server.outbox_counter
@@ -119,10 +346,19 @@ async def count_outbox(context: Context[CtxData], handle: str) -> int:
 
 @server.outbox_first_cursor
 async def first_outbox_cursor(context: Context[CtxData], handle: str) -> str:
-    return "0"
+    return ""
 
 
 @server.outbox_last_cursor
 async def last_outbox_cursor(context: Context[CtxData], handle: str) -> str:
     async with context.data.connect_db() as db:
-        return str((await count_posts(db) // PAGE_WINDOW) * PAGE_WINDOW)
+        # The last page holds the oldest 1 to PAGE_WINDOW posts, and its cursor
+        # is the id of the post right after them:
+        total = await count_posts(db)
+        if total <= PAGE_WINDOW:
+            # The last page is the first page too:
+            return ""
+        last_before = await get_post_id_after(
+            db, 0, (total - 1) % PAGE_WINDOW + 1
+        )
+        return "" if last_before is None else str(last_before)
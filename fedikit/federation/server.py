@@ -1,28 +1,44 @@
-import json
 import re
-from collections.abc import Mapping
-from dataclasses import dataclass
+from asyncio import gather
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from inspect import isawaitable, iscoroutinefunction
 from typing import (
     Any,
     Awaitable,
     Callable,
+    Final,
     Generic,
     Optional,
+    ParamSpec,
     Protocol,
     Self,
     TypeAlias,
     TypeVar,
+    cast,
 )
-from urllib.parse import quote
-
-from hypercorn.typing import ASGIReceiveCallable, ASGISendCallable, Scope
-from werkzeug.datastructures import Headers
+from urllib.parse import parse_qsl, quote
+
+from hypercorn.typing import (
+    ASGIReceiveCallable,
+    ASGISendCallable,
+    HTTPResponseBodyEvent,
+    HTTPResponseStartEvent,
+    HTTPScope,
+    Scope,
+)
+from werkzeug.datastructures import Headers, MIMEAccept
 from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.http import parse_accept_header
 from werkzeug.routing import Map, MapAdapter, Rule
 from werkzeug.sansio.request import Request
+from werkzeug.sansio.utils import get_host
 
 from ..model.converters import jsonld
 from ..model.entity import EntityRef
+from ..model.jsonio import dump_json
 from ..uri import Uri
 from ..vocab import link
 from ..vocab.activity import Activity
@@ -40,9 +56,30 @@ __all__ = [
     "Request",
     "Server",
     "ServerAsgi",
+    "is_acceptable",
 ]
 
 
+@lru_cache(maxsize=4096)
+def quote_cursor(cursor: str) -> str:
+    # The same cursors tend to be quoted over and over again, e.g., the first
+    # and last cursors of an outbox:
+    return quote(cursor)
+
+
+def get_query_arg(query_string: bytes, name: str) -> Optional[str]:
+    # Parses the query string the same way as Request.args does, but without
+    # building a Request and a MultiDict just to look up a single argument:
+    for key, value in parse_qsl(
+        query_string.decode(),
+        keep_blank_values=True,
+        errors="werkzeug.url_quote",
+    ):
+        if key == name:
+            return value
+    return None
+
+
 #: A type alias for an ASGI application.
 AsgiApp: TypeAlias = Callable[
     [
@@ -54,6 +91,132 @@ AsgiApp: TypeAlias = Callable[
 ]
 
 
+#: The default ports of URL schemes, which are omitted from server names.
+DEFAULT_PORTS: Final[Mapping[str, int]] = {
+    "http": 80,
+    "https": 443,
+    "ws": 80,
+    "wss": 443,
+}
+
+
+#: The media types (and wildcards) in ``Accept`` headers that JSON-LD and JRD
+#: responses satisfy.
+ACCEPTABLE_MEDIA_TYPES: Final[frozenset[str]] = frozenset({
+    "application/ld+json",
+    "application/activity+json",
+    "application/json",
+    "application/*",
+    "*/*",
+})
+
+
+def is_acceptable(accept: MIMEAccept) -> bool:
+    """Check if the given ``Accept`` header is satisfied by JSON-LD and JRD
+    responses.  An empty ``Accept`` header is satisfied by any response.
+
+    :param accept: The parsed ``Accept`` header.
+    :return: ``True`` if the ``Accept`` header is satisfied.
+    """
+    if not accept:
+        return True
+    # Look up each media type with its parameters (e.g., profile) stripped,
+    # instead of matching all acceptable media types against each one:
+    for value, quality in accept:
+        if (
+            quality > 0
+            and value.split(";", 1)[0].strip().lower()
+            in ACCEPTABLE_MEDIA_TYPES
+        ):
+            return True
+    return False
+
+
+# The response events that never change are built only once:
+TEXT_PLAIN_HEADERS: Final[tuple[tuple[bytes, bytes], ...]] = (
+    (b"content-type", b"text/plain"),
+)
+JRD_HEADERS: Final[tuple[tuple[bytes, bytes], ...]] = (
+    (b"content-type", b"application/jrd+json"),
+)
+JSONLD_HEADERS: Final[tuple[tuple[bytes, bytes], ...]] = (
+    (
+        b"content-type",
+        (
+            b"application/ld+json;"
+            b' profile="https://www.w3.org/ns/activitystreams"'
+        ),
+    ),
+)
+NOT_FOUND_START: Final[HTTPResponseStartEvent] = {
+    "type": "http.response.start",
+    "status": 404,
+    "headers": TEXT_PLAIN_HEADERS,
+}
+NOT_FOUND_BODY: Final[HTTPResponseBodyEvent] = {
+    "type": "http.response.body",
+    "body": b"Not Found",
+    "more_body": False,
+}
+METHOD_NOT_ALLOWED_START: Final[HTTPResponseStartEvent] = {
+    "type": "http.response.start",
+    "status": 405,
+    "headers": TEXT_PLAIN_HEADERS,
+}
+METHOD_NOT_ALLOWED_BODY: Final[HTTPResponseBodyEvent] = {
+    "type": "http.response.body",
+    "body": b"Method Not Allowed",
+    "more_body": False,
+}
+NOT_ACCEPTABLE_START: Final[HTTPResponseStartEvent] = {
+    "type": "http.response.start",
+    "status": 406,
+    "headers": TEXT_PLAIN_HEADERS,
+}
+NOT_ACCEPTABLE_BODY: Final[HTTPResponseBodyEvent] = {
+    "type": "http.response.body",
+    "body": b"Not Acceptable",
+    "more_body": False,
+}
+MISSING_RESOURCE_START: Final[HTTPResponseStartEvent] = {
+    "type": "http.response.start",
+    "status": 400,
+    "headers": TEXT_PLAIN_HEADERS,
+}
+MISSING_RESOURCE_BODY: Final[HTTPResponseBodyEvent] = {
+    "type": "http.response.body",
+    "body": b"Missing resource parameter",
+    "more_body": False,
+}
+
+
+async def send_response(
+    send: ASGISendCallable,
+    status: int,
+    headers: Iterable[tuple[bytes, bytes]],
+    body: bytes,
+) -> None:
+    """Send a complete response with the given body.  The body is already
+    serialized as a whole, so it is sent in a single event as is; splitting it
+    would only copy it into chunks without sending its first byte any sooner.
+
+    :param send: The ASGI send callable.
+    :param status: The HTTP status code.
+    :param headers: The response headers.
+    :param body: The whole response body.
+    """
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": headers,
+    })
+    await send({
+        "type": "http.response.body",
+        "body": body,
+        "more_body": False,
+    })
+
+
 async def non_http(
     scope: Scope,
     receive: ASGIReceiveCallable,
@@ -67,16 +230,8 @@ async def not_found(
     receive: ASGIReceiveCallable,
     send: ASGISendCallable,
 ) -> None:
-    await send({
-        "type": "http.response.start",
-        "status": 404,
-        "headers": [(b"content-type", b"text/plain")],
-    })
-    await send({
-        "type": "http.response.body",
-        "body": b"Not Found",
-        "more_body": False,
-    })
+    await send(NOT_FOUND_START)
+    await send(NOT_FOUND_BODY)
 
 
 async def method_not_allowed(
@@ -84,16 +239,8 @@ async def method_not_allowed(
     receive: ASGIReceiveCallable,
     send: ASGISendCallable,
 ) -> None:
-    await send({
-        "type": "http.response.start",
-        "status": 405,
-        "headers": [(b"content-type", b"text/plain")],
-    })
-    await send({
-        "type": "http.response.body",
-        "body": b"Method Not Allowed",
-        "more_body": False,
-    })
+    await send(METHOD_NOT_ALLOWED_START)
+    await send(METHOD_NOT_ALLOWED_BODY)
 
 
 async def not_acceptable(
@@ -101,27 +248,54 @@ async def not_acceptable(
     receive: ASGIReceiveCallable,
     send: ASGISendCallable,
 ) -> None:
-    await send({
-        "type": "http.response.start",
-        "status": 406,
-        "headers": [(b"content-type", b"text/plain")],
-    })
-    await send({
-        "type": "http.response.body",
-        "body": b"Not Acceptable",
-        "more_body": False,
-    })
+    await send(NOT_ACCEPTABLE_START)
+    await send(NOT_ACCEPTABLE_BODY)
+
+
+#: The media type of the actors' links in WebFinger responses.
+ACTIVITY_JSON_MEDIA_TYPE: Final[MediaType] = MediaType(
+    "application/activity+json"
+)
+
+#: The WebFinger link relation for actors' URLs without their own relation.
+PROFILE_PAGE_REL: Final[str] = "http://webfinger.net/rel/profile-page"
+
+#: The pattern of ``acct:`` URIs.  The host part is compared to the request's
+#: host case-insensitively as a plain string, so that the pattern does not
+#: depend on the request.
+ACCT_URI_PATTERN: Final[re.Pattern[str]] = re.compile(r"^acct:([^@]+)@(.+)\Z")
+
+
+def url_to_link(url: Uri | link.Link) -> Link:
+    """Turn one of an actor's URLs into a WebFinger link.
+
+    :param url: The actor's URL, either a bare URI or a link object.
+    :return: The WebFinger link.
+    """
+    if isinstance(url, link.Link):
+        return Link(
+            rel=url.rel or PROFILE_PAGE_REL,
+            href=url.href,
+            type=None if url.media_type is None else MediaType(url.media_type),
+        )
+    return Link(rel=PROFILE_PAGE_REL, href=url, type=ACTIVITY_JSON_MEDIA_TYPE)
 
 
 TContextData = TypeVar("TContextData")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, init=False)
 class Context(Generic[TContextData]):
-    """A context for a request."""
+    """A context for a request.
+
+    :param request: The request object, or a function to make it.  If it is
+        a function, it is called when :attr:`request` is accessed for the first
+        time.
+    :param map_adapter: The routing map adapter.
+    :param data: The user-defined context data.
+    """
 
-    #: The request object.
-    request: Request
+    _request: Request | Callable[[], Request] = field(repr=False)
 
     #: The routing map adapter.
     map_adapter: MapAdapter
@@ -129,6 +303,27 @@ class Context(Generic[TContextData]):
     #: The user-defined context data.
     data: TContextData
 
+    def __init__(
+        self,
+        request: Request | Callable[[], Request],
+        map_adapter: MapAdapter,
+        data: TContextData,
+    ) -> None:
+        object.__setattr__(self, "_request", request)
+        object.__setattr__(self, "map_adapter", map_adapter)
+        object.__setattr__(self, "data", data)
+
+    @property
+    def request(self) -> Request:
+        """The request object.  Since many requests are handled without it,
+        it is made only when this is accessed for the first time.
+        """
+        request = self._request
+        if not isinstance(request, Request):
+            request = request()
+            object.__setattr__(self, "_request", request)
+        return request
+
     def actor_uri(self, handle: str) -> Uri:
         """Return the URI of an actor with the given handle.
 
@@ -136,11 +331,7 @@ class Context(Generic[TContextData]):
         :return: The actor's URI.
 
         """
-        return Uri(
-            self.map_adapter.build(
-                "actor", {"handle": handle}, force_external=True
-            )
-        )
+        return self._build_uri("actor", handle)
 
     def outbox_uri(self, handle: str) -> Uri:
         """Return the URI of an actor's outbox with the given handle.
@@ -149,13 +340,42 @@ class Context(Generic[TContextData]):
         :return: The actor's outbox URI.
 
         """
-        return Uri(
-            self.map_adapter.build(
-                "outbox", {"handle": handle}, force_external=True
-            )
+        return self._build_uri("outbox", handle)
+
+    def _build_uri(self, endpoint: str, handle: str) -> Uri:
+        adapter = self.map_adapter
+        return build_uri(
+            adapter.map,
+            adapter.server_name,
+            adapter.script_name,
+            adapter.subdomain,
+            adapter.url_scheme,
+            endpoint,
+            handle,
         )
 
 
+@lru_cache(maxsize=4096)
+def build_uri(
+    map: Map,
+    server_name: str,
+    script_name: str,
+    subdomain: Optional[str],
+    url_scheme: str,
+    endpoint: str,
+    handle: str,
+) -> Uri:
+    # The same URIs are built over and over again (e.g., an actor's URI for
+    # every activity in its outbox), so they are cached by everything that
+    # an external URL built by a MapAdapter depends on:
+    adapter = MapAdapter(
+        map, server_name, script_name, subdomain, url_scheme, "/", "GET", None
+    )
+    return Uri(
+        adapter.build(endpoint, {"handle": handle}, force_external=True)
+    )
+
+
 class ActorDispatcher(Protocol[TContextData]):
     """A protocol for callables that dispatch actors."""
 
@@ -195,20 +415,70 @@ class OutboxCursor(Protocol[TContextData]):
     ) -> Optional[str] | Awaitable[Optional[str]]: ...
 
 
+T = TypeVar("T")
+P = ParamSpec("P")
+
+
+def ensure_async(
+    func: Callable[P, T | Awaitable[T]],
+) -> Callable[P, Awaitable[T]]:
+    """Turn a function which returns either a value or an awaitable into
+    a coroutine function.  Coroutine functions are returned as they are.
+
+    :param func: The function to turn into a coroutine function.
+    :return: The coroutine function.
+    """
+    if iscoroutinefunction(func):
+        return cast(Callable[P, Awaitable[T]], func)
+
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        result = func(*args, **kwargs)
+        if isawaitable(result):
+            return cast(T, await result)
+        return cast(T, result)
+
+    return wrapper
+
+
 class Server(Generic[TContextData]):
     """A server to handle requests from the fediverse."""
 
+    __slots__ = (
+        "_map",
+        "_actor_dispatcher",
+        "_outbox_dispatcher",
+        "_outbox_counter",
+        "_outbox_first_cursor",
+        "_outbox_last_cursor",
+    )
+
     _map: Map
-    _actor_dispatcher: Optional[ActorDispatcher[TContextData]]
-    _outbox_dispatcher: Optional[OutboxDispatcher[TContextData]]
-    _outbox_counter: Optional[OutboxCounter[TContextData]]
-    _outbox_first_cursor: Optional[OutboxCursor[TContextData]]
-    _outbox_last_cursor: Optional[OutboxCursor[TContextData]]
+    # The registered callbacks are stored as coroutine functions, so that they
+    # can be simply awaited (see ensure_async()):
+    _actor_dispatcher: Optional[
+        Callable[[Context[TContextData], str], Awaitable[Optional[Actor]]]
+    ]
+    _outbox_dispatcher: Optional[
+        Callable[
+            [Context[TContextData], str, Optional[str]],
+            Awaitable[Optional[Page[Activity]]],
+        ]
+    ]
+    _outbox_counter: Optional[
+        Callable[[Context[TContextData], str], Awaitable[Optional[int]]]
+    ]
+    _outbox_first_cursor: Optional[
+        Callable[[Context[TContextData], str], Awaitable[Optional[str]]]
+    ]
+    _outbox_last_cursor: Optional[
+        Callable[[Context[TContextData], str], Awaitable[Optional[str]]]
+    ]
 
     def __init__(self) -> None:
         self._map = Map([
             Rule("/.well-known/webfinger", endpoint="webfinger"),
         ])
+        self._map.update()
         self._actor_dispatcher = None
         self._outbox_dispatcher = None
         self._outbox_counter = None
@@ -221,7 +491,8 @@ class Server(Generic[TContextData]):
         :return: A copy of the server.
         """
         clone = type(self)()
-        clone._map = Map(rule.empty() for rule in self._map.iter_rules())
+        clone._map = Map([rule.empty() for rule in self._map.iter_rules()])
+        clone._map.update()
         clone._actor_dispatcher = self._actor_dispatcher
         clone._outbox_dispatcher = self._outbox_dispatcher
         clone._outbox_counter = self._outbox_counter
@@ -244,8 +515,12 @@ class Server(Generic[TContextData]):
         def decorate(
             dispatch: ActorDispatcher[TContextData],
         ) -> ActorDispatcher[TContextData]:
-            self._actor_dispatcher = dispatch
+            self._actor_dispatcher = ensure_async(dispatch)
             self._map.add(rule)
+            # Compile the routing map now rather than on the first request,
+            # and forget URIs built with the previous rules:
+            self._map.update()
+            build_uri.cache_clear()
             return dispatch
 
         return decorate
@@ -265,8 +540,12 @@ class Server(Generic[TContextData]):
         def decorate(
             dispatch: OutboxDispatcher[TContextData],
         ) -> OutboxDispatcher[TContextData]:
-            self._outbox_dispatcher = dispatch
+            self._outbox_dispatcher = ensure_async(dispatch)
             self._map.add(rule)
+            # Compile the routing map now rather than on the first request,
+            # and forget URIs built with the previous rules:
+            self._map.update()
+            build_uri.cache_clear()
             return dispatch
 
         return decorate
@@ -275,21 +554,21 @@ class Server(Generic[TContextData]):
         self, count: OutboxCounter[TContextData]
     ) -> OutboxCounter[TContextData]:
         """A decorator to register an outbox counter."""
-        self._outbox_counter = count
+        self._outbox_counter = ensure_async(count)
         return count
 
     def outbox_first_cursor(
         self, cursor: OutboxCursor[TContextData]
     ) -> OutboxCursor[TContextData]:
         """A decorator to register an outbox first cursor."""
-        self._outbox_first_cursor = cursor
+        self._outbox_first_cursor = ensure_async(cursor)
         return cursor
 
     def outbox_last_cursor(
         self, cursor: OutboxCursor[TContextData]
     ) -> OutboxCursor[TContextData]:
         """A decorator to register an outbox last cursor."""
-        self._outbox_last_cursor = cursor
+        self._outbox_last_cursor = ensure_async(cursor)
         return cursor
 
     async def dispatch_actor(
@@ -303,10 +582,7 @@ class Server(Generic[TContextData]):
         """
         if self._actor_dispatcher is None:
             return None
-        dispatched = self._actor_dispatcher(context, handle)
-        if dispatched is None or isinstance(dispatched, Actor):
-            return dispatched
-        return await dispatched
+        return await self._actor_dispatcher(context, handle)
 
     async def dispatch_outbox(
         self,
@@ -323,10 +599,7 @@ class Server(Generic[TContextData]):
         """
         if self._outbox_dispatcher is None:
             return None
-        dispatched = self._outbox_dispatcher(context, handle, cursor)
-        if dispatched is None or isinstance(dispatched, Page):
-            return dispatched
-        return await dispatched
+        return await self._outbox_dispatcher(context, handle, cursor)
 
     async def count_outbox(
         self, context: Context[TContextData], handle: str
@@ -340,10 +613,7 @@ class Server(Generic[TContextData]):
         """
         if self._outbox_counter is None:
             return None
-        total_items = self._outbox_counter(context, handle)
-        if total_items is None or isinstance(total_items, int):
-            return total_items
-        return await total_items
+        return await self._outbox_counter(context, handle)
 
     async def get_outbox_first_cursor(
         self, context: Context[TContextData], handle: str
@@ -357,10 +627,7 @@ class Server(Generic[TContextData]):
         """
         if self._outbox_first_cursor is None:
             return None
-        cursor = self._outbox_first_cursor(context, handle)
-        if cursor is None or isinstance(cursor, str):
-            return cursor
-        return await cursor
+        return await self._outbox_first_cursor(context, handle)
 
     async def get_outbox_last_cursor(
         self, context: Context[TContextData], handle: str
@@ -374,10 +641,7 @@ class Server(Generic[TContextData]):
         """
         if self._outbox_last_cursor is None:
             return None
-        cursor = self._outbox_last_cursor(context, handle)
-        if cursor is None or isinstance(cursor, str):
-            return cursor
-        return await cursor
+        return await self._outbox_last_cursor(context, handle)
 
     def asgi(
         self,
@@ -401,6 +665,16 @@ class Server(Generic[TContextData]):
         :param on_not_acceptable: The ASGI application to call if the request
             does not accept the response media type.  If omitted, a 406
             response is returned in this case.
+
+        .. tip::
+
+           Since the overhead of handling a request is mostly that of the event
+           loop, serving the application on uvloop_ is recommended, e.g.,
+           with Hypercorn's ``--worker-class uvloop`` option.  Hypercorn also
+           serves HTTP/2, which lets other servers reuse a connection for
+           many requests.
+
+           .. _uvloop: https://github.com/MagicStack/uvloop
         """
         return ServerAsgi[TContextData](
             self,
@@ -412,17 +686,54 @@ class Server(Generic[TContextData]):
         )
 
 
+#: The maximum number of serialized actors that a :class:`ServerAsgi` keeps.
+ACTOR_BODY_CACHE_SIZE: Final[int] = 1024
+
+
+#: The maximum number of URL map adapters (i.e., distinct hosts) that
+#: a :class:`ServerAsgi` keeps.
+MAP_ADAPTER_CACHE_SIZE: Final[int] = 256
+
+
+#: A type alias for the handlers of :class:`ServerAsgi`'s routed endpoints.
+EndpointHandler: TypeAlias = Callable[
+    [
+        Context[TContextData],
+        Mapping[str, Any],
+        HTTPScope,
+        ASGIReceiveCallable,
+        ASGISendCallable,
+    ],
+    Awaitable[None],
+]
+
+
 class ServerAsgi(Generic[TContextData]):
     """An ASGI application for a :class:`Server`.  Usually instantiated by
     :meth:`Server.asgi()` method.
     """
 
+    __slots__ = (
+        "server",
+        "context_data",
+        "on_non_http",
+        "on_not_found",
+        "on_method_not_allowed",
+        "on_not_acceptable",
+        "_endpoint_handlers",
+        "_actor_bodies",
+        "_map_adapters",
+    )
+
     server: Server[TContextData]
     context_data: TContextData
     on_non_http: AsgiApp
     on_not_found: AsgiApp
     on_method_not_allowed: AsgiApp
     on_not_acceptable: AsgiApp
+    _endpoint_handlers: Mapping[str, EndpointHandler[TContextData]]
+    _actor_bodies: OrderedDict[Actor, bytes]
+    _map_adapters: OrderedDict[tuple[str, str, str], MapAdapter]
 
     def __init__(
         self,
@@ -439,6 +750,15 @@ class ServerAsgi(Generic[TContextData]):
         self.on_not_found = on_not_found
         self.on_method_not_allowed = on_method_not_allowed
         self.on_not_acceptable = on_not_acceptable
+        # Routed endpoints are looked up by name, and their handlers are
+        # bound only once:
+        self._endpoint_handlers = {
+            "webfinger": self._webfinger_asgi,
+            "actor": self._actor_asgi,
+            "outbox": self._outbox_asgi,
+        }
+        self._actor_bodies = OrderedDict()
+        self._map_adapters = OrderedDict()
 
     async def __call__(
         self,
@@ -452,151 +772,142 @@ class ServerAsgi(Generic[TContextData]):
         server = scope["server"]
         if server is None:
             server_name = None
-        elif (
-            url_scheme == "http"
-            and server[1] == 80
-            or url_scheme == "https"
-            and server[1] == 443
-        ):
+        elif server[1] is None or DEFAULT_PORTS.get(url_scheme) == server[1]:
             server_name = server[0]
         else:
             server_name = "{0}:{1}".format(*server)
         script_name = scope["root_path"]
         method = scope["method"]
-        path_info = scope["path"][len(script_name) :]
-        query_string = scope["query_string"].decode("ascii")
-        headers = Headers(
-            (k.decode("ascii"), v.decode("ascii")) for k, v in scope["headers"]
-        )
-        adapter = self.server._map.bind(
-            headers.get("Host", server_name) or "",
-            script_name,
-            url_scheme=url_scheme,
-            default_method=method,
-            path_info=path_info,
-            query_args=query_string,
+        path_info = (
+            scope["path"][len(script_name) :] if script_name else scope["path"]
         )
+        query_string = scope["query_string"].decode("ascii")
+        # Only the Host and Accept headers are needed before dispatching, so
+        # the rest of headers are decoded only if the request object is used.
+        # Note that ASGI servers pass header names in lowercase.  Headers are
+        # decoded as Latin-1 like WSGI does, which never fails on obs-text:
+        host: Optional[str] = None
+        accept: Optional[str] = None
+        for k, v in scope["headers"]:
+            if k == b"host" and host is None:
+                host = v.decode("latin-1")
+            elif k == b"accept" and accept is None:
+                accept = v.decode("latin-1")
+        # The map is bound only once per host, since the request-specific
+        # parts (path, method and query) can be passed to match() instead.
+        # As the Host header is up to clients, only recent hosts are kept:
+        key = (host or server_name or "", script_name, url_scheme)
+        adapters = self._map_adapters
+        adapter = adapters.get(key)
+        if adapter is None:
+            adapter = self.server._map.bind(
+                key[0], script_name, url_scheme=url_scheme
+            )
+            adapters[key] = adapter
+            if len(adapters) > MAP_ADAPTER_CACHE_SIZE:
+                del adapters[next(iter(adapters))]
+        else:
+            adapters.move_to_end(key)
         try:
-            endpoint, args = adapter.match()
+            endpoint, args = adapter.match(
+                path_info, method, query_args=query_string
+            )
         except NotFound:
+            # The built-in responders are inlined, as requests to other paths
+            # are common:
+            if self.on_not_found is not_found:
+                await send(NOT_FOUND_START)
+                return await send(NOT_FOUND_BODY)
             return await self.on_not_found(scope, receive, send)
         except MethodNotAllowed:
+            if self.on_method_not_allowed is method_not_allowed:
+                await send(METHOD_NOT_ALLOWED_START)
+                return await send(METHOD_NOT_ALLOWED_BODY)
             return await self.on_method_not_allowed(scope, receive, send)
-        request = Request(
-            method,
-            url_scheme,
-            scope["server"],
-            script_name,
-            path_info,
-            scope["query_string"],
-            headers,
-            scope["client"] and scope["client"][0],
-        )
-        if not (
-            len(request.accept_mimetypes) < 1
-            or "application/ld+json" in request.accept_mimetypes  # type: ignore
-            or "application/activity+json" in request.accept_mimetypes  # type: ignore
-            or "application/json" in request.accept_mimetypes  # type: ignore
+        # Most fediverse software sends a bare media type (e.g.,
+        # application/activity+json) or no Accept header at all, and neither
+        # needs to be parsed:
+        if (
+            accept
+            and accept not in ACCEPTABLE_MEDIA_TYPES
+            and not is_acceptable(parse_accept_header(accept, MIMEAccept))
         ):
+            if self.on_not_acceptable is not_acceptable:
+                await send(NOT_ACCEPTABLE_START)
+                return await send(NOT_ACCEPTABLE_BODY)
             return await self.on_not_acceptable(scope, receive, send)
-        context = Context(request, adapter, self.context_data)
-        match endpoint:
-            case "webfinger":
-                return await self._webfinger_asgi(
-                    context, args, scope, receive, send
-                )
-            case "actor":
-                return await self._actor_asgi(
-                    context, args, scope, receive, send
-                )
-            case "outbox":
-                return await self._outbox_asgi(
-                    context, args, scope, receive, send
-                )
-        return await self.on_not_found(scope, receive, send)
+
+        def make_request() -> Request:
+            # Building a list first is cheaper than letting Headers consume
+            # a generator:
+            headers = Headers([
+                (k.decode("latin-1"), v.decode("latin-1"))
+                for k, v in scope["headers"]
+            ])
+            return Request(
+                method,
+                url_scheme,
+                scope["server"],
+                script_name,
+                path_info,
+                scope["query_string"],
+                headers,
+                scope["client"] and scope["client"][0],
+            )
+
+        context = Context(make_request, adapter, self.context_data)
+        handler = self._endpoint_handlers.get(endpoint)
+        if handler is None:
+            return await self.on_not_found(scope, receive, send)
+        return await handler(context, args, scope, receive, send)
 
     async def _webfinger_asgi(
         self,
         context: Context[TContextData],
         args: Mapping[str, Any],
-        scope: Scope,
+        scope: HTTPScope,
         receive: ASGIReceiveCallable,
         send: ASGISendCallable,
     ) -> None:
         if self.server._actor_dispatcher is None:
             return await self.on_not_found(scope, receive, send)
-        resource = context.request.args.get("resource")
+        resource = get_query_arg(scope["query_string"], "resource")
         if resource is None:
-            await send({
-                "type": "http.response.start",
-                "status": 400,
-                "headers": [(b"content-type", b"text/plain")],
-            })
-            await send({
-                "type": "http.response.body",
-                "body": b"Missing resource parameter",
-                "more_body": False,
-            })
+            await send(MISSING_RESOURCE_START)
+            await send(MISSING_RESOURCE_BODY)
             return
-        match = re.match(
-            r"^acct:([^@]+)@" + re.escape(context.request.host) + r"$",
-            resource,
-        )
-        if not match:
+        match = ACCT_URI_PATTERN.match(resource)
+        # The map adapter is bound to the Host header (or the server name),
+        # which get_host() validates and normalizes like Request.host:
+        host = get_host(scope["scheme"], context.map_adapter.server_name)
+        if not match or match.group(2).lower() != host.lower():
             return await self.on_not_found(scope, receive, send)
         handle = match.group(1)
         actor = await self.server.dispatch_actor(context, handle)
         if actor is None:
             return await self.on_not_found(scope, receive, send)
+        actor_uri = context.actor_uri(handle)
         links: list[Link] = [
             Link(
                 rel="self",
-                href=context.actor_uri(handle),
-                type=MediaType("application/activity+json"),
-            )
+                href=actor_uri,
+                type=ACTIVITY_JSON_MEDIA_TYPE,
+            ),
+            # map() runs the conversion without a generator frame:
+            *map(url_to_link, actor.urls),
         ]
-        for url in actor.urls:
-            if isinstance(url, link.Link):
-                links.append(
-                    Link(
-                        rel=url.rel or "http://webfinger.net/rel/profile-page",
-                        href=url.href,
-                        type=(
-                            None
-                            if url.media_type is None
-                            else MediaType(url.media_type)
-                        ),
-                    )
-                )
-            else:
-                links.append(
-                    Link(
-                        rel="http://webfinger.net/rel/profile-page",
-                        href=url,
-                        type=MediaType("application/activity+json"),
-                    )
-                )
         jrd = ResourceDescriptor(
             subject=Uri(resource),
-            aliases=[context.actor_uri(handle)],
+            aliases=[actor_uri],
             links=links,
         )
-        await send({
-            "type": "http.response.start",
-            "status": 200,
-            "headers": [(b"content-type", b"application/jrd+json")],
-        })
-        await send({
-            "type": "http.response.body",
-            "body": json.dumps(jrd.to_json()).encode("utf-8"),
-            "more_body": False,
-        })
+        await send_response(send, 200, JRD_HEADERS, dump_json(jrd.to_json()))
 
     async def _actor_asgi(
         self,
         context: Context[TContextData],
         args: Mapping[str, Any],
-        scope: Scope,
+        scope: HTTPScope,
         receive: ASGIReceiveCallable,
         send: ASGISendCallable,
     ) -> None:
@@ -605,42 +916,44 @@ class ServerAsgi(Generic[TContextData]):
         )
         if actor is None:
             return await self.on_not_found(scope, receive, send)
-        doc = await jsonld(actor)
-        await send({
-            "type": "http.response.start",
-            "status": 200,
-            "headers": [(
-                b"content-type",
-                (
-                    b"application/ld+json;"
-                    b' profile="https://www.w3.org/ns/activitystreams"'
-                ),
-            )],
-        })
-        await send({
-            "type": "http.response.body",
-            "body": json.dumps(doc).encode("utf-8"),
-            "more_body": False,
-        })
+        # Actors are cached by their values rather than their ids, so that
+        # changed actors are never served stale:
+        cache = self._actor_bodies
+        try:
+            body = cache.get(actor)
+        except TypeError:  # The actor has unhashable extra values
+            body = await self._serialize_actor(actor)
+        else:
+            if body is None:
+                body = await self._serialize_actor(actor)
+                cache[actor] = body
+                if len(cache) > ACTOR_BODY_CACHE_SIZE:
+                    del cache[next(iter(cache))]
+            else:
+                cache.move_to_end(actor)
+        await send_response(send, 200, JSONLD_HEADERS, body)
+
+    async def _serialize_actor(self, actor: Actor) -> bytes:
+        return dump_json(await jsonld(actor))
 
     async def _outbox_asgi(
         self,
         context: Context[TContextData],
         args: Mapping[str, Any],
-        scope: Scope,
+        scope: HTTPScope,
         receive: ASGIReceiveCallable,
         send: ASGISendCallable,
     ) -> None:
         handle = args["handle"]
-        cursor = context.request.args.get("cursor")
+        cursor = get_query_arg(scope["query_string"], "cursor")
+        # The URI of the outbox is built only once for all cursors:
+        cursor_uri = context.outbox_uri(handle) + "?cursor="
         if cursor is None:
-            first_cursor = await self.server.get_outbox_first_cursor(
-                context, handle
-            )
-            last_cursor = await self.server.get_outbox_last_cursor(
-                context, handle
+            first_cursor, last_cursor, total_items = await gather(
+                self.server.get_outbox_first_cursor(context, handle),
+                self.server.get_outbox_last_cursor(context, handle),
+                self.server.count_outbox(context, handle),
             )
-            total_items = await self.server.count_outbox(context, handle)
             if first_cursor is None:
                 page: Optional[Page[Activity]] = (
                     await self.server.dispatch_outbox(
@@ -657,15 +970,11 @@ class ServerAsgi(Generic[TContextData]):
             else:
                 collection = OrderedCollection(
                     total_items=total_items,
-                    first=EntityRef(
-                        f"{context.outbox_uri(handle)}?cursor={quote(first_cursor)}"
-                    ),
+                    first=EntityRef(cursor_uri + quote_cursor(first_cursor)),
                     last=(
                         None
                         if last_cursor is None
-                        else EntityRef(
-                            f"{context.outbox_uri(handle)}?cursor={quote(last_cursor)}"
-                        )
+                        else EntityRef(cursor_uri + quote_cursor(last_cursor))
                     ),
                 )
         else:
@@ -677,33 +986,14 @@ class ServerAsgi(Generic[TContextData]):
                 prev=(
                     None
                     if prev_cursor is None
-                    else EntityRef(
-                        f"{context.outbox_uri(handle)}?cursor={quote(prev_cursor)}"
-                    )
+                    else EntityRef(cursor_uri + quote_cursor(prev_cursor))
                 ),
                 next=(
                     None
                     if next_cursor is None
-                    else EntityRef(
-                        f"{context.outbox_uri(handle)}?cursor={quote(next_cursor)}"
-                    )
+                    else EntityRef(cursor_uri + quote_cursor(next_cursor))
                 ),
                 ordered_items=items,
             )
         doc = await jsonld(collection)
-        await send({
-            "type": "http.response.start",
-            "status": 200,
-            "headers": [(
-                b"content-type",
-                (
-                    b"application/ld+json;"
-                    b' profile="https://www.w3.org/ns/activitystreams"'
-                ),
-            )],
-        })
-        await send({
-            "type": "http.response.body",
-            "body": json.dumps(doc).encode("utf-8"),
-            "more_body": False,
-        })
+        await send_response(send, 200, JSONLD_HEADERS, dump_json(doc))
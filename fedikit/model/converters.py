@@ -1,5 +1,14 @@
 from datetime import datetime
-from typing import Any, Mapping, NewType, Optional, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Final,
+    Mapping,
+    NewType,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes
 from cryptography.hazmat.primitives.serialization import (
@@ -17,6 +26,56 @@ from .scalars import ScalarValue
 __all__ = ["from_jsonld", "jsonld"]
 
 
+def value_to_jsonld(value: Union[str, bool]) -> dict[str, Any]:
+    return {"@value": value}
+
+
+def int_to_jsonld(value: int) -> dict[str, Any]:
+    return {
+        "@value": value,
+        "@type": (
+            "http://www.w3.org/2001/XMLSchema#integer"
+            if value < 0
+            else "http://www.w3.org/2001/XMLSchema#nonNegativeInteger"
+        ),
+    }
+
+
+def float_to_jsonld(value: float) -> dict[str, Any]:
+    return {
+        "@value": value,
+        "@type": "http://www.w3.org/2001/XMLSchema#float",
+    }
+
+
+def datetime_to_jsonld(value: datetime) -> dict[str, Any]:
+    return {
+        "@type": "http://www.w3.org/2001/XMLSchema#dateTime",
+        "@value": value.isoformat(),
+    }
+
+
+def language_to_jsonld(value: Language) -> dict[str, Any]:
+    return {"@value": str(value)}
+
+
+def duration_to_jsonld(value: Duration) -> dict[str, Any]:
+    return {"@value": format_duration(value)}
+
+
+#: The converters of scalar values, looked up by their exact types before
+#: falling back to the pattern matching (which also handles subclasses):
+SCALAR_CONVERTERS: Final[Mapping[type, Callable[[Any], dict[str, Any]]]] = {
+    str: value_to_jsonld,
+    bool: value_to_jsonld,
+    int: int_to_jsonld,
+    float: float_to_jsonld,
+    datetime: datetime_to_jsonld,
+    Language: language_to_jsonld,
+    Duration: duration_to_jsonld,
+}
+
+
 async def jsonld(
     value: Union[ScalarValue, "Entity"],
     expand: bool = False,
@@ -31,35 +90,32 @@ async def jsonld(
     :return: The JSON-LD document.
     :raises TypeError: If the given value cannot be converted to JSON-LD.
     """
-    if hasattr(value, "__jsonld__"):
-        doc = value.__jsonld__(expand=expand, loader=loader)  # pyright: ignore
-        return dict(doc if isinstance(doc, Mapping) else await doc)
+    convert = SCALAR_CONVERTERS.get(type(value))
+    if convert is not None:
+        return convert(value)
+    # Looking up the method on the type, unlike hasattr(), involves neither
+    # the instance dictionary nor a swallowed AttributeError:
+    to_jsonld = getattr(type(value), "__jsonld__", None)
+    if to_jsonld is not None:
+        doc = to_jsonld(value, expand=expand, loader=loader)
+        if not isinstance(doc, Mapping):
+            doc = await doc
+        # Documents are usually made afresh as dicts, so only other mappings
+        # need to be copied:
+        return doc if type(doc) is dict else dict(doc)
     match value:
         case str() | bool():
-            return {"@value": value}
+            return value_to_jsonld(value)
         case int():
-            return {
-                "@value": value,
-                "@type": (
-                    "http://www.w3.org/2001/XMLSchema#integer"
-                    if value < 0
-                    else "http://www.w3.org/2001/XMLSchema#nonNegativeInteger"
-                ),
-            }
+            return int_to_jsonld(value)
         case float():
-            return {
-                "@value": value,
-                "@type": "http://www.w3.org/2001/XMLSchema#float",
-            }
+            return float_to_jsonld(value)
         case datetime():
-            return {
-                "@type": "http://www.w3.org/2001/XMLSchema#dateTime",
-                "@value": value.isoformat(),
-            }
+            return datetime_to_jsonld(value)
         case Language():
-            return {"@value": str(value)}
+            return language_to_jsonld(value)
         case Duration():
-            return {"@value": format_duration(value)}
+            return duration_to_jsonld(value)
         case _ if isinstance(value, PublicKeyTypes):  # type: ignore
             return {
                 "@value": value.public_bytes(  # type: ignore
@@ -89,12 +145,11 @@ async def from_jsonld(
     """
     if isinstance(cls, NewType):
         cls = cls.__supertype__
-    if hasattr(cls, "__from_jsonld__"):
-        instance = cls.__from_jsonld__(document, loader)  # type: ignore
+    parse = getattr(cls, "__from_jsonld__", None)
+    if parse is not None:
+        instance = parse(document, loader)
         return (  # type: ignore
-            instance
-            if isinstance(instance, cls)
-            else await instance  # type: ignore
+            instance if isinstance(instance, cls) else await instance
         )
     elif issubclass(cls, (str, bool)):
         return cls(document["@value"])  # type: ignore
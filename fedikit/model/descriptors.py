@@ -1,8 +1,10 @@
 import typing
 from abc import ABC, abstractmethod, abstractproperty
+from asyncio import gather
 from collections.abc import Sequence
 from importlib import import_module
 from inspect import currentframe
+from sys import intern
 from types import GenericAlias, UnionType
 from typing import Any, ForwardRef, NewType, Optional, Self, Union
 
@@ -27,6 +29,8 @@ __all__ = [
 
 
 class Property(ABC):
+    __slots__ = ()
+
     @abstractproperty
     def uri(self) -> "Uri":
         raise NotImplementedError
@@ -57,10 +61,16 @@ class Property(ABC):
     ]: ...
 
 
+#: The URI of :class:`IdProperty`, which is the JSON-LD keyword ``@id``.
+ID_URI: "Uri" = Uri("@id")
+
+
 class IdProperty(Property):
+    __slots__ = ()
+
     @property
     def uri(self) -> "Uri":
-        return Uri("@id")
+        return ID_URI
 
     def __get__(
         self, instance: Any | None, cls: type["Entity"]
@@ -91,33 +101,82 @@ class IdProperty(Property):
 
 
 class ResourceProperty(Property):
+    __slots__ = ("subproperties", "class_def_site", "_uri", "_resolved_types")
+
     subproperties: Sequence["Uri"]
     class_def_site: Optional[str]
     _uri: "Uri"
-
-    def __init__(self, uri: "Uri", subproperties: Sequence["Uri"] = ()):
-        self._uri = uri
-        self.subproperties = subproperties
+    _resolved_types: dict[Any, tuple[type, ...]]
+
+    def __init__(
+        self,
+        uri: "Uri",
+        subproperties: Sequence["Uri"] = (),
+        class_def_site: Optional[str] = None,
+    ):
+        # Property URIs are the keys of entities' values, so they are interned
+        # to let dict lookups succeed by identity rather than by comparing
+        # whole strings:
+        self._uri = Uri(intern(uri))
+        self.subproperties = tuple(Uri(intern(sub)) for sub in subproperties)
+        self._resolved_types = {}
+        if class_def_site is not None:
+            self.class_def_site = class_def_site
+            return
+        # Skip the frames of this module to find the module that defines
+        # the property.  Frames are told apart by their globals' identity,
+        # which is cheaper than comparing filenames:
+        module_globals = globals()
         current_frame = currentframe()
-        if current_frame is None:
-            self.class_def_site = None
-        else:
-            current_filename = current_frame.f_code.co_filename
-            while (
-                current_frame is not None
-                and current_frame.f_code.co_filename == current_filename
-            ):
-                current_frame = current_frame.f_back
-            self.class_def_site = (
-                current_frame and current_frame.f_globals.get("__name__")
-            )
+        while (
+            current_frame is not None
+            and current_frame.f_globals is module_globals
+        ):
+            current_frame = current_frame.f_back
+        self.class_def_site = current_frame and current_frame.f_globals.get(
+            "__name__"
+        )
 
     @property
     def uri(self) -> "Uri":
         return self._uri
 
+    def _resolve_types(self, type_: Any) -> list[Any]:
+        """Flatten the given type hint into a list of candidate types, with
+        deferred type names resolved in the module the property is defined.
+        """
+        if isinstance(type_, UnionType):
+            types = list(type_.__args__)
+        elif (
+            isinstance(type_, typing._GenericAlias)  # type: ignore
+            and type_.__origin__ is Union
+        ):
+            types = list(type_.__args__)
+        elif isinstance(type_, NewType):
+            types = [type_.__supertype__]
+        else:
+            types = [type_]
+        for i, t in enumerate(types):
+            if isinstance(t, (str, ForwardRef)):
+                t_name = t if isinstance(t, str) else t.__forward_arg__
+                t = self.class_def_site and getattr(
+                    import_module(self.class_def_site), t_name, None
+                )
+                if t is None or not isinstance(t, type):
+                    raise ReferenceError(
+                        f"failed to resolve deferred type name {t_name!r}"
+                    )
+                types[i] = t
+            elif t is Uri:
+                types[i] = str
+            elif isinstance(t, typing._LiteralGenericAlias):  # type: ignore
+                types[i] = str  # FIXME: support other literal types
+        return types
+
 
 class PluralProperty(ResourceProperty):
+    __slots__ = ()
+
     def __get__(
         self, instance: Any | None, cls: type["Entity"]
     ) -> Self | Sequence[Any]:
@@ -130,11 +189,14 @@ class PluralProperty(ResourceProperty):
         return values
 
     def normalize(self, value: Any) -> "Slot":
-        return [v for v in value]
+        return tuple(value)
 
     def check_slot(self, slot: "Slot") -> bool:
         return not isinstance(slot, str) and len(slot) != 1
 
+    def repr_value(self, slot: "Slot") -> Any:
+        return list(slot)
+
     async def parse_jsonld(
         self, type_: Any, value: Any, loader: Optional[DocumentLoader] = None
     ) -> Union[
@@ -144,67 +206,71 @@ class PluralProperty(ResourceProperty):
         "Entity",
         Sequence[Union["EntityRef", "ScalarValue", "Entity"]],
     ]:
-        if not (
-            isinstance(
-                type_,
-                (GenericAlias, typing._GenericAlias),  # type: ignore
-            )
-            and type_.__origin__ in (Sequence, typing.Sequence)
-        ):
-            raise TypeError(f"expected Sequence[T], got {type_!r}")
-        element_type = type_.__args__[0]
-        if isinstance(element_type, UnionType):
-            element_types = list(element_type.__args__)
-        elif (
-            isinstance(element_type, typing._GenericAlias)  # type: ignore
-            and element_type.__origin__ is Union
-        ):
-            element_types = list(element_type.__args__)
-        elif isinstance(element_type, NewType):
-            element_types = [element_type.__supertype__]
-        else:
-            element_types = [element_type]
-        for i, et in enumerate(element_types):
-            if isinstance(et, (str, ForwardRef)):
-                et_name = et if isinstance(et, str) else et.__forward_arg__
-                et = self.class_def_site and getattr(
-                    import_module(self.class_def_site), et_name, None
+        from .entity import Entity, EntityRef
+
+        # Values that consist only of references (e.g., to and cc) need no
+        # type hints at all:
+        if all(len(v) == 1 and "@id" in v for v in value):
+            return [EntityRef(v["@id"]) for v in value]
+        # Type hints are resolved only once per property, since they never
+        # change but are looked up for every entity being parsed:
+        element_types = self._resolved_types.get(type_)
+        if element_types is None:
+            if not (
+                isinstance(
+                    type_,
+                    (GenericAlias, typing._GenericAlias),  # type: ignore
                 )
-                if et is None or not isinstance(et, type):
-                    raise ReferenceError(
-                        f"failed to resolve deferred type name {et_name!r}"
-                    )
-                element_types[i] = et
-            elif et is Uri:
-                element_types[i] = str
-            elif isinstance(et, typing._LiteralGenericAlias):  # type: ignore
-                element_types[i] = str  # FIXME: support other literal types
-        if not all(isinstance(et, type) for et in element_types):
-            raise TypeError(
-                f"expected Sequence[T] where T is a class, got {type_!r}"
-            )
-        parsed = []
-        for v in value:
-            if len(v) == 1 and "@id" in v:
-                from .entity import EntityRef
+                and type_.__origin__ in (Sequence, typing.Sequence)
+            ):
+                raise TypeError(f"expected Sequence[T], got {type_!r}")
+            resolved = self._resolve_types(type_.__args__[0])
+            if not all(isinstance(et, type) for et in resolved):
+                raise TypeError(
+                    f"expected Sequence[T] where T is a class, got {type_!r}"
+                )
+            element_types = self._resolved_types[type_] = tuple(resolved)
 
-                parsed.append(EntityRef(v["@id"]))
-                continue
+        async def parse(v: Any) -> Any:
             for et in element_types:
                 try:
-                    parsed.append(
-                        await from_jsonld(
-                            et, v, loader=loader  # pyright: ignore
+                    # Elements are parts of an expanded document, so
+                    # entities are parsed without expanding them again:
+                    if issubclass(et, Entity):
+                        return await et.__from_jsonld__(
+                            v, loader, expanded=True
                         )
+                    return await from_jsonld(
+                        et, v, loader=loader  # pyright: ignore
                     )
                 except ValueError:
                     continue
-                else:
-                    break
-        return parsed
+            return None  # No type matches; the element is left out
+
+        parsed: list[Any] = []
+        pending: list[tuple[int, Any]] = []
+        for v in value:
+            if len(v) == 1 and "@id" in v:
+                parsed.append(EntityRef(v["@id"]))
+                continue
+            pending.append((len(parsed), v))
+            parsed.append(None)
+        # Embedded entities may each have to be expanded (and load remote
+        # contexts), so they are parsed concurrently.  The results are put
+        # back in place to keep the order of the elements.  A lone element is
+        # awaited directly, without scheduling a task for it:
+        if len(pending) == 1:
+            results = [await parse(pending[0][1])]
+        else:
+            results = await gather(*(parse(v) for _, v in pending))
+        for (i, _), result in zip(pending, results):
+            parsed[i] = result
+        return [p for p in parsed if p is not None]
 
 
 class SingularProperty(ResourceProperty):
+    __slots__ = ()
+
     def __get__(self, instance: Any | None, cls: type["Entity"]) -> Self | Any:
         if instance is None:
             return self
@@ -214,7 +280,7 @@ class SingularProperty(ResourceProperty):
         return None
 
     def normalize(self, value: Any) -> "Slot":
-        return [] if value is None else [(value)]
+        return () if value is None else (value,)
 
     def check_slot(self, slot: "Slot") -> bool:
         return not isinstance(slot, str) and len(slot) == 1
@@ -231,44 +297,31 @@ class SingularProperty(ResourceProperty):
         "Entity",
         Sequence[Union["EntityRef", "ScalarValue", "Entity"]],
     ]:
-        if isinstance(type_, UnionType):
-            types = list(type_.__args__)
-        elif (
-            isinstance(type_, typing._GenericAlias)  # type: ignore
-            and type_.__origin__ is Union
-        ):
-            types = list(type_.__args__)
-        elif isinstance(type_, NewType):
-            types = [type_.__supertype__]
-        else:
-            types = [type_]
-        for i, t in enumerate(types):
-            if isinstance(t, (str, ForwardRef)):
-                t_name = t if isinstance(t, str) else t.__forward_arg__
-                t = self.class_def_site and getattr(
-                    import_module(self.class_def_site), t_name, None
+        from .entity import Entity, EntityRef
+
+        # A leading reference is returned as the loop below would do, but
+        # without resolving the type hint:
+        if value and len(value[0]) == 1 and "@id" in value[0]:
+            return EntityRef(value[0]["@id"])
+        types = self._resolved_types.get(type_)
+        if types is None:
+            resolved = self._resolve_types(type_)
+            if not all(isinstance(t, type) for t in resolved):
+                raise TypeError(
+                    "expected T or Union[T, ...] where T is a class, got"
+                    f" {type_!r}"
                 )
-                if t is None or not isinstance(t, type):
-                    raise ReferenceError(
-                        f"failed to resolve deferred type name {t_name!r}"
-                    )
-                types[i] = t
-            elif t is Uri:
-                types[i] = str
-            elif isinstance(t, typing._LiteralGenericAlias):  # type: ignore
-                types[i] = str  # FIXME: support other literal types
-        if not all(isinstance(t, type) for t in types):
-            raise TypeError(
-                "expected T or Union[T, ...] where T is a class, got"
-                f" {type_!r}"
-            )
+            types = self._resolved_types[type_] = tuple(resolved)
         for v in value:
             if len(v) == 1 and "@id" in v:
-                from .entity import EntityRef
-
                 return EntityRef(v["@id"])
             for t in types:
                 try:
+                    # See PluralProperty.parse_jsonld():
+                    if issubclass(t, Entity):
+                        return await t.__from_jsonld__(
+                            v, loader, expanded=True
+                        )
                     return await from_jsonld(
                         t, v, loader=loader  # pyright: ignore
                     )
@@ -281,9 +334,25 @@ def id_property() -> Any:
     return IdProperty()
 
 
+def get_caller_module_name() -> Optional[str]:
+    # The frame two levels up is the caller of the function calling this,
+    # i.e., the class body that defines a property:
+    frame = currentframe()
+    caller = frame and frame.f_back and frame.f_back.f_back
+    return caller and caller.f_globals.get("__name__")
+
+
 def plural_property(uri: "Uri", subproperties: Sequence["Uri"] = ()) -> Any:
-    return PluralProperty(uri, subproperties=subproperties)
+    return PluralProperty(
+        uri,
+        subproperties=subproperties,
+        class_def_site=get_caller_module_name(),
+    )
 
 
 def singular_property(uri: "Uri", subproperties: Sequence["Uri"] = ()) -> Any:
-    return SingularProperty(uri, subproperties=subproperties)
+    return SingularProperty(
+        uri,
+        subproperties=subproperties,
+        class_def_site=get_caller_module_name(),
+    )
@@ -2,7 +2,13 @@ from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Callable, Optional, Sequence, TypeAlias
 
-__all__ = ["DocumentLoader", "Json", "RemoteDocument"]
+__all__ = [
+    "DocumentLoader",
+    "Json",
+    "RemoteDocument",
+    "is_non_blocking",
+    "non_blocking",
+]
 
 
 #: A type alias for JSON values.
@@ -34,3 +40,26 @@ class RemoteDocument:
 #: A document loader which is a function that takes a URL and returns
 #: a :class:`Document`.
 DocumentLoader: TypeAlias = Callable[[str], Optional[RemoteDocument]]
+
+
+def non_blocking(loader: DocumentLoader) -> DocumentLoader:
+    """Mark a document loader as one that never blocks on I/O, e.g., one that
+    only looks up preloaded documents in memory.  JSON-LD processing with
+    such a loader is run directly in the event loop, instead of being handed
+    off to a worker thread.  Can be used as a decorator.
+
+    :param loader: The document loader to mark.
+    :return: The same document loader.
+    """
+    loader.__non_blocking__ = True  # type: ignore[attr-defined]
+    return loader
+
+
+def is_non_blocking(loader: Optional[DocumentLoader]) -> bool:
+    """Check if a document loader is marked by :func:`non_blocking()`.
+
+    :param loader: The document loader to check.  ``None`` means the default
+        document loader, which makes HTTP requests.
+    :return: ``True`` if the loader never blocks on I/O.
+    """
+    return getattr(loader, "__non_blocking__", False)
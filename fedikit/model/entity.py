@@ -1,7 +1,11 @@
-from asyncio import to_thread
-from collections.abc import Iterable, Mapping, MutableSequence, Sequence
+import re
+from asyncio import gather, to_thread
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping, Sequence
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Callable,
     ClassVar,
     Optional,
     Self,
@@ -12,22 +16,25 @@ from typing import (
     dataclass_transform,
     get_type_hints,
 )
-
-from pyld import jsonld
-from pyld.documentloader.requests import requests_document_loader
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
 
 from ..uri import Uri
 from .converters import jsonld as to_jsonld
 from .descriptors import Property, SingularProperty
-from .docloader import DocumentLoader
+from .docloader import DocumentLoader, is_non_blocking
+from .jsonio import dump_json, load_json
 from .scalars import ScalarValue
 
+# PyLD and Requests take long to import, and are needed only once documents
+# are actually processed, so they are imported where they are used:
+if TYPE_CHECKING:
+    from requests import Session
+
 __all__ = ["Entity", "EntityRef", "Slot", "load_entity_refs"]
 
 
-Slot: TypeAlias = (
-    Uri | MutableSequence[Union["EntityRef", ScalarValue, "Entity"]]
-)
+Slot: TypeAlias = Uri | tuple[Union["EntityRef", ScalarValue, "Entity"], ...]
 
 
 @dataclass_transform(frozen_default=True, kw_only_default=True)
@@ -49,22 +56,59 @@ class Entity:
     #: Whether the type is abstract.  Abstract types cannot be instantiated.
     __abstract__: ClassVar[bool] = True
 
+    __slots__ = ("_values", "__extra__", "_hash")
+
     _values: Mapping[Uri, Slot]
     __extra__: Mapping[Uri, Any]
+    _hash: Optional[int]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Subclasses are registered as soon as they are defined, so that
+        # get_entity_type() never has to walk the class hierarchy.  A subclass
+        # that inherits its parent's URI does not take its parent's place:
+        uri = getattr(cls, "__uri__", None)
+        if uri is not None:
+            entity_types.setdefault(uri, cls)
+        # Properties are collected as well, so that the first entity of the
+        # type to be made or parsed does not pay for it.  Unlike them, type
+        # hints are left to be resolved later, since they may refer to names
+        # that are not defined yet:
+        get_uri_descriptors(cls)
 
     @classmethod
     async def __from_jsonld__(
         cls,
         document: Mapping[str, Any],
         loader: Optional[DocumentLoader] = None,
+        *,
+        expanded: bool = False,
     ) -> Self:
-        doc_loader = get_raw_document_loader(loader)
-        doc = await to_thread(
-            lambda: jsonld.expand(
-                document,
-                {"documentLoader": doc_loader},
-            )[0]
-        )
+        """Parse an entity from a JSON-LD document.
+
+        Embedded entities and loaded references are parsed from documents
+        that have already been expanded as a whole, so they are passed here
+        with ``expanded=True`` instead of being expanded again.  Subclasses
+        that override this method therefore take part in parsing embedded
+        entities as well, and have to accept the flag.
+
+        :param document: The JSON-LD document to parse.
+        :param loader: A document loader to use.  If not given, the default
+            document loader will be used.
+        :param expanded: Whether the document is already expanded.
+        :return: The parsed entity.
+        :raises ValueError: If the document is not of the type.
+        """
+        doc: Mapping[str, Any]
+        if expanded:
+            doc = document
+        else:
+            from pyld import jsonld
+
+            options = get_jsonld_options(loader)
+            doc = await run_jsonld(
+                loader, lambda: jsonld.expand(document, options)[0]
+            )
         if "@type" in doc:
             if cls.__abstract__ or cls.__uri__ not in doc["@type"]:
                 for doc_type in doc["@type"]:
@@ -72,7 +116,9 @@ class Entity:
                     if entity_type is not None and issubclass(
                         entity_type, cls
                     ):
-                        return await entity_type.__from_jsonld__(doc)
+                        return await entity_type.__from_jsonld__(
+                            doc, loader, expanded=True
+                        )
                 raise ValueError(
                     f"unsupported type: {doc['@type']!r}"
                     if cls.__abstract__
@@ -83,13 +129,14 @@ class Entity:
         descriptors: Mapping[Uri, Mapping[str, Property]] = (
             get_uri_descriptors(cls)
         )
-        type_hints = get_type_hints(cls)
-        for uri, vals in doc.items():
-            desc_dict = descriptors.get(Uri(uri), {})
-            desc_kvs = list(desc_dict.items())
-            # Give priority to plural properties over singular ones:
-            desc_kvs.sort(key=lambda kv: isinstance(kv[1], SingularProperty))
-            for name, desc in desc_kvs:
+        type_hints = get_entity_type_hints(cls)
+        # Since Uri is a NewType of str, the keys of the expanded document are
+        # used as they are, without calling Uri() for every one of them:
+        uri: Uri
+        for uri, vals in doc.items():  # type: ignore[assignment]
+            # Plural properties come first, as get_uri_descriptors() orders:
+            desc_dict = descriptors.get(uri, {})
+            for name, desc in desc_dict.items():
                 try:
                     values[name] = await desc.parse_jsonld(
                         type_hints[name], vals
@@ -100,7 +147,7 @@ class Entity:
                     break
             else:
                 if uri != "@type":
-                    extra[Uri(uri)] = vals
+                    extra[uri] = vals
         instance = cls(**values, __extra__=extra)
         return instance
 
@@ -117,9 +164,12 @@ class Entity:
         values: dict[Uri, Slot] = {}
         props: dict[Uri, str] = {}
         cls = type(self)
+        # The cached descriptors are looked up instead of calling getattr()
+        # on the class for every keyword argument:
+        descriptors = get_descriptors(cls)
         for key, value in kwargs.items():
-            desc = getattr(cls, key, None)
-            if not isinstance(desc, Property):
+            desc = descriptors.get(key)
+            if desc is None:
                 raise AttributeError(
                     f"{cls.__name__} has no property named {key!r}"
                 )
@@ -132,6 +182,7 @@ class Entity:
             props[desc.uri] = key
         self._values = values
         self.__extra__ = dict(__extra__)
+        self._hash = None
 
     def __eq__(self, other: object) -> bool:
         if type(self) is not type(other):
@@ -145,58 +196,89 @@ class Entity:
         return not (self == other)
 
     def __hash__(self) -> int:
-        values = list(self._values.items())
-        values.sort(key=lambda kv: kv[0])
-        hv = hash(type(self))
-        for uri, slot in values:
-            hv = (37 * hv & 0xFFFFFFFF) + hash(uri) & 0xFFFFFFFF
-            if isinstance(slot, str):
-                hv = (37 * hv & 0xFFFFFFFF) + hash(slot) & 0xFFFFFFFF
-                continue
-            for value in slot:
-                hv = (37 * hv & 0xFFFFFFFF) + hash(value) & 0xFFFFFFFF
-        extra = list(self.__extra__.items())
-        extra.sort(key=lambda kv: kv[0])
-        for uri, value in extra:
-            hv = (37 * hv & 0xFFFFFFFF) + hash(uri) & 0xFFFFFFFF
-            hv = (37 * hv & 0xFFFFFFFF) + hash(value) & 0xFFFFFFFF
-        return hv
+        # Entities are immutable, so the hash is computed only once.  Both
+        # mappings are hashed as frozensets, which do not depend on the order
+        # of items, as the equality does not.  Slots are either strings or
+        # tuples, so they are hashed as they are:
+        if self._hash is None:
+            self._hash = hash((
+                type(self),
+                frozenset(self._values.items()),
+                frozenset(self.__extra__.items()),
+            ))
+        return self._hash
 
     async def __jsonld__(
         self, *, expand: bool = False, loader: Optional[DocumentLoader] = None
     ) -> Mapping[str, Any]:
         doc: dict[str, Any] = {"@type": type(self).__uri__}
+        pending: list[tuple[list[Any], int, Entity]] = []
         for uri, slot in self._values.items():
             if isinstance(slot, str):
                 doc[uri] = slot
                 continue
             elif not slot:
                 continue
-            doc[uri] = [
-                (
-                    {"@id": v.uri}
-                    if isinstance(v, EntityRef)
-                    else await to_jsonld(v, expand=True, loader=loader)
-                )
-                for v in slot
+            elements: list[Any] = []
+            for v in slot:
+                if isinstance(v, EntityRef):
+                    elements.append({"@id": v.uri})
+                elif isinstance(v, Entity):
+                    pending.append((elements, len(elements), v))
+                    elements.append(None)
+                else:
+                    elements.append(
+                        await to_jsonld(v, expand=True, loader=loader)
+                    )
+            doc[uri] = elements
+        # Embedded entities may each have to be expanded (and load remote
+        # contexts), so they are expanded concurrently across all properties,
+        # and then put back in place.  A lone entity is awaited directly,
+        # without scheduling a task for it:
+        if len(pending) == 1:
+            results = [
+                await to_jsonld(pending[0][2], expand=True, loader=loader)
             ]
+        else:
+            results = await gather(*(
+                to_jsonld(v, expand=True, loader=loader) for _, _, v in pending
+            ))
+        for (elements, i, _), expanded in zip(pending, results):
+            elements[i] = expanded
         for uri, value in self.__extra__.items():
             doc[uri] = value
-        doc_loader = get_raw_document_loader(loader)
+        # The same entities (e.g., actors and the activities in outboxes) are
+        # serialized again and again, so the results are looked up first:
+        key: Optional[tuple[Any, ...]]
+        try:
+            key = (type(self), expand, loader, dump_json(doc, sort_keys=True))
+            cached = jsonld_cache.get(key)
+        except TypeError:
+            # Extra values may not be JSON, and loaders may be unhashable:
+            key = cached = None
+        if key is not None and cached is not None:
+            jsonld_cache.move_to_end(key)
+            return cast(dict[str, Any], load_json(cached))
+        from pyld import jsonld
+
+        options = get_jsonld_options(loader)
+        result: dict[str, Any]
         if expand:
-            return await to_thread(
-                lambda: jsonld.expand(
-                    doc,
-                    {"documentLoader": doc_loader},
-                )[0]
+            result = await run_jsonld(
+                loader, lambda: jsonld.expand(doc, options)[0]
             )
-        return await to_thread(
-            lambda: jsonld.compact(
-                doc,
-                type(self).__default_context__,
-                {"documentLoader": doc_loader},
+        else:
+            result = await run_jsonld(
+                loader,
+                lambda: jsonld.compact(
+                    doc, type(self).__default_context__, options
+                ),
             )
-        )
+        if key is not None:
+            jsonld_cache[key] = dump_json(result)
+            if len(jsonld_cache) > JSONLD_CACHE_SIZE:
+                del jsonld_cache[next(iter(jsonld_cache))]
+        return result
 
     def __repr__(self) -> str:
         cls = type(self)
@@ -218,17 +300,6 @@ entity_types: dict[Uri, type[Entity]] = {}
 
 
 def get_entity_type(type_uri: Uri) -> Optional[type[Entity]]:
-    if not entity_types:
-
-        def collect_entity_types(cls: type[Entity]) -> None:
-            global entity_types
-            for subclass in cls.__subclasses__():
-                if subclass.__uri__ not in entity_types:
-                    entity_types[subclass.__uri__] = subclass
-            for subclass in cls.__subclasses__():
-                collect_entity_types(subclass)
-
-        collect_entity_types(Entity)
     return entity_types.get(type_uri)
 
 
@@ -239,10 +310,17 @@ def get_descriptors(cls: type[Entity]) -> Mapping[str, Property]:
     global descriptors
     properties = descriptors.get(cls)
     if properties is None:
+        # Class dictionaries are merged along the MRO instead of calling
+        # getattr() for every name in dir(cls), so that the descriptor
+        # protocol is not invoked for each of them.  Names are still sorted
+        # as dir() does:
+        attrs: dict[str, Any] = {}
+        for c in reversed(cls.__mro__):
+            attrs.update(vars(c))
         properties = {
-            name: getattr(cls, name)
-            for name in dir(cls)
-            if isinstance(getattr(cls, name), Property)
+            name: attrs[name]
+            for name in sorted(attrs)
+            if isinstance(attrs[name], Property)
         }
         descriptors[cls] = properties
     return properties
@@ -259,25 +337,162 @@ def get_uri_descriptors(
         return uri_descriptors[cls]
     uri_props: dict[Uri, dict[str, Property]] = {}
     props = get_descriptors(cls)
-    for name, prop in props.items():
+    # Plural properties are put before singular ones, so that they are given
+    # priority when a JSON-LD document is parsed:
+    for name, prop in sorted(
+        props.items(), key=lambda kv: isinstance(kv[1], SingularProperty)
+    ):
         uri_props.setdefault(prop.uri, {})[name] = prop
     uri_descriptors[cls] = uri_props
     return uri_props
 
 
-def get_raw_document_loader(loader: Optional[DocumentLoader] = None) -> Any:
-    if loader is None:
-        orig_loader = requests_document_loader()
-        return lambda url, options: orig_loader(
-            url,
-            {
-                **options,
-                "headers": {
+entity_type_hints: dict[type[Entity], Mapping[str, Any]] = {}
+
+
+def get_entity_type_hints(cls: type[Entity]) -> Mapping[str, Any]:
+    # Unlike get_descriptors(), this must not be called until the module that
+    # defines the class has been fully loaded, since deferred type names are
+    # evaluated here:
+    global entity_type_hints
+    hints = entity_type_hints.get(cls)
+    if hints is None:
+        hints = get_type_hints(cls)
+        entity_type_hints[cls] = hints
+    return hints
+
+
+#: The maximum number of documents made by :meth:`Entity.__jsonld__()` to
+#: keep in :data:`jsonld_cache`.
+JSONLD_CACHE_SIZE: int = 1024
+
+# Documents made by Entity.__jsonld__(), keyed by the entity type, whether
+# expanded, the document loader, and the document before expansion or
+# compaction in JSON.  Only the least recently used ones are evicted.  They
+# are kept in JSON, so that every hit gives a fresh copy to the caller:
+jsonld_cache: OrderedDict[tuple[Any, ...], bytes] = OrderedDict()
+
+
+R = TypeVar("R")
+
+
+async def run_jsonld(
+    loader: Optional[DocumentLoader], func: Callable[[], R]
+) -> R:
+    # JSON-LD processing may load remote documents, so it is run in a worker
+    # thread unless the document loader is known not to block:
+    if is_non_blocking(loader):
+        return func()
+    return await to_thread(func)
+
+
+#: The media types that the default document loader accepts.
+DEFAULT_LOADER_ACCEPT: str = "application/ld+json, application/json"
+
+#: The pattern of JSON media types, which need no alternate JSON-LD document.
+JSON_MEDIA_TYPE_PATTERN: re.Pattern[str] = re.compile(
+    r"^application/(\w*\+)?json$"
+)
+
+
+#: The tag of documents that raw document loaders return.  PyLD keeps the
+#: contexts resolved from remote documents tagged ``static`` in the cache of
+#: its context resolver, so that remote contexts like ActivityStreams are
+#: fetched and processed only once rather than once per JSON-LD operation.
+#: See also :func:`get_jsonld_options()`.
+STATIC_DOCUMENT_TAG: str = "static"
+
+
+def session_document_loader(session: "Session") -> Any:
+    """Make a raw document loader that works like PyLD's Requests document
+    loader, except that all requests go through the given session, so that
+    connections to the same hosts are kept alive and reused.
+    """
+    from pyld import jsonld
+
+    def loader(url: str, options: Any) -> Any:
+        pieces = urlparse(url)
+        if pieces.scheme not in ("http", "https") or not pieces.netloc:
+            raise jsonld.JsonLdError(
+                'URL could not be dereferenced; only "http" and "https" URLs'
+                " are supported.",
+                "jsonld.InvalidUrl",
+                {"url": url},
+                code="loading document failed",
+            )
+        try:
+            response = session.get(
+                url,
+                headers={
                     **options.get("headers", {}),
-                    "Accept": "application/ld+json, application/json",
+                    "Accept": DEFAULT_LOADER_ACCEPT,
                 },
-            },
-        )
+            )
+            content_type = (
+                response.headers.get("content-type")
+                or "application/octet-stream"
+            )
+            doc = {
+                "contentType": content_type,
+                "contextUrl": None,
+                "documentUrl": response.url,
+                "document": response.json(),
+                "tag": STATIC_DOCUMENT_TAG,
+            }
+            link_header = response.headers.get("link")
+            if link_header:
+                links = jsonld.parse_link_header(link_header)
+                linked_context = links.get(jsonld.LINK_HEADER_REL)
+                if linked_context and content_type != "application/ld+json":
+                    if isinstance(linked_context, list):
+                        raise jsonld.JsonLdError(
+                            "URL could not be dereferenced, it has more than"
+                            " one associated HTTP Link Header.",
+                            "jsonld.LoadDocumentError",
+                            {"url": url},
+                            code="multiple context link headers",
+                        )
+                    doc["contextUrl"] = linked_context["target"]
+                linked_alternate = links.get("alternate")
+                if (
+                    linked_alternate
+                    and linked_alternate.get("type") == "application/ld+json"
+                    and not JSON_MEDIA_TYPE_PATTERN.match(content_type)
+                ):
+                    doc["contentType"] = "application/ld+json"
+                    doc["documentUrl"] = jsonld.prepend_base(
+                        url, linked_alternate["target"]
+                    )
+            return doc
+        except jsonld.JsonLdError:
+            raise
+        except Exception as cause:
+            raise jsonld.JsonLdError(
+                "Could not retrieve a JSON-LD document from the URL.",
+                "jsonld.LoadDocumentError",
+                code="loading document failed",
+                cause=cause,
+            ) from cause
+
+    return loader
+
+
+# The default raw document loader does not depend on anything, so it is made
+# only once, by the first get_raw_document_loader() call without a loader.
+# It shares a single session among all documents to load:
+default_raw_document_loader: Optional[Any] = None
+
+
+def get_raw_document_loader(loader: Optional[DocumentLoader] = None) -> Any:
+    global default_raw_document_loader
+    from pyld import jsonld
+
+    if loader is None:
+        if default_raw_document_loader is None:
+            from requests import Session
+
+            default_raw_document_loader = session_document_loader(Session())
+        return default_raw_document_loader
 
     def doc_loader(url: str, options: Any) -> Any:
         document = loader(url)
@@ -292,11 +507,65 @@ def get_raw_document_loader(loader: Optional[DocumentLoader] = None) -> Any:
             "contextUrl": document.context_url,
             "documentUrl": document.url,
             "document": document.document,
+            "tag": STATIC_DOCUMENT_TAG,
         }
 
     return doc_loader
 
 
+#: The maximum number of resolved contexts to keep per document loader.
+CONTEXT_CACHE_SIZE: int = 100
+
+# The caches of resolved contexts.  Different loaders may give different
+# documents for the same URL, so each loader has its own cache, which goes
+# away with the loader:
+context_caches: WeakKeyDictionary[DocumentLoader, Any] = WeakKeyDictionary()
+default_context_cache: Optional[Any] = None
+
+
+def get_context_cache(loader: Optional[DocumentLoader] = None) -> Any:
+    global default_context_cache
+    from cachetools import LRUCache
+
+    if loader is None:
+        if default_context_cache is None:
+            default_context_cache = LRUCache(maxsize=CONTEXT_CACHE_SIZE)
+        return default_context_cache
+    try:
+        cache = context_caches.get(loader)
+        if cache is None:
+            cache = context_caches[loader] = LRUCache(
+                maxsize=CONTEXT_CACHE_SIZE
+            )
+    except TypeError:
+        # The loader cannot be weakly referenced, so its contexts are cached
+        # only during a single operation:
+        cache = LRUCache(maxsize=CONTEXT_CACHE_SIZE)
+    return cache
+
+
+def get_jsonld_options(
+    loader: Optional[DocumentLoader] = None,
+) -> dict[str, Any]:
+    """Make the options for a PyLD operation with the given loader.  Unlike
+    PyLD's default context resolver, whose cache is shared by all loaders,
+    the resolver it makes keeps resolved contexts per loader.
+
+    :param loader: A document loader to use.  If not given, the default
+        document loader will be used.
+    :return: The options to pass to PyLD.
+    """
+    from pyld.context_resolver import ContextResolver
+
+    doc_loader = get_raw_document_loader(loader)
+    return {
+        "documentLoader": doc_loader,
+        "contextResolver": ContextResolver(
+            get_context_cache(loader), doc_loader
+        ),
+    }
+
+
 T = TypeVar("T", bound=Entity)
 
 
@@ -305,6 +574,8 @@ class EntityRef:
     to entities in other entities, which are not loaded yet.
     """
 
+    __slots__ = ("uri",)
+
     #: The URI of the entity.
     uri: Uri
 
@@ -333,18 +604,18 @@ class EntityRef:
         """
         if not issubclass(cls, Entity):
             raise TypeError(f"expected a subtype of Entity, got {cls!r}")
-        document_loader = get_raw_document_loader(loader)
-        loaded = await to_thread(lambda: document_loader(self.uri, {}))
-        doc = await to_thread(
-            lambda: jsonld.expand(
-                loaded["document"],
-                {
-                    "documentLoader": document_loader,
-                    "expandContext": loaded["contextUrl"],
-                },
-            )
+        from pyld import jsonld
+
+        options = get_jsonld_options(loader)
+        document_loader = options["documentLoader"]
+        loaded = await run_jsonld(
+            loader, lambda: document_loader(self.uri, {})
+        )
+        options["expandContext"] = loaded["contextUrl"]
+        doc = await run_jsonld(
+            loader, lambda: jsonld.expand(loaded["document"], options)
         )
-        return await cls.__from_jsonld__(doc[0], loader=loader)
+        return await cls.__from_jsonld__(doc[0], loader, expanded=True)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.uri!r})"
@@ -373,12 +644,32 @@ async def load_entity_refs(
                 raise AttributeError(
                     f"{type(entity).__name__} has no property named {prop!r}"
                 )
+    values = dict(entity._values)
+    pending: list[tuple[Uri, int, EntityRef]] = []
     for name, descriptor in descriptors.items():
         if properties is not None and name not in properties:
             continue
-        slot = entity._values.get(descriptor.uri)
+        slot = values.get(descriptor.uri)
         if slot is None or isinstance(slot, str):
             continue
         for i, value in enumerate(slot):
             if isinstance(value, EntityRef):
-                slot[i] = await value.load(Entity, loader=loader)
+                pending.append((descriptor.uri, i, value))
+    if not pending:
+        return
+    # References are independent of each other, so they are loaded
+    # concurrently rather than one remote round trip after another:
+    results = await gather(
+        *(ref.load(Entity, loader=loader) for _, _, ref in pending)
+    )
+    # Slots are immutable tuples, so the ones having references are rebuilt
+    # with the loaded entities in place:
+    rebuilt: dict[Uri, list[Any]] = {}
+    for (uri, i, _), result in zip(pending, results):
+        if uri not in rebuilt:
+            rebuilt[uri] = list(values[uri])
+        rebuilt[uri][i] = result
+    for uri, elements in rebuilt.items():
+        values[uri] = tuple(elements)
+    entity._values = values
+    entity._hash = None
@@ -0,0 +1,47 @@
+import json
+from typing import Any, Final
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ["dump_json", "load_json"]
+
+
+# Since json.dumps() makes a new encoder whenever it is given any options,
+# the fallback encoders are made only once.  They emit the same compact
+# output as orjson:
+JSON_ENCODER: Final[json.JSONEncoder] = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":")
+)
+SORTED_JSON_ENCODER: Final[json.JSONEncoder] = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), sort_keys=True
+)
+
+
+def dump_json(doc: Any, sort_keys: bool = False) -> bytes:
+    """Serialize a JSON document into UTF-8 bytes.  It uses :mod:`orjson`
+    if installed, which is much faster than the standard :mod:`json` module.
+
+    :param doc: The JSON document to serialize.
+    :param sort_keys: Whether to sort the keys of objects, so that equal
+        documents are serialized into the same bytes.
+    :return: The serialized JSON document.
+    :raises TypeError: If the document is not JSON.
+    """
+    if orjson is None:
+        encoder = SORTED_JSON_ENCODER if sort_keys else JSON_ENCODER
+        return encoder.encode(doc).encode("utf-8")
+    return orjson.dumps(doc, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+
+def load_json(data: bytes) -> Any:
+    """Deserialize a JSON document serialized by :func:`dump_json()`.
+
+    :param data: The serialized JSON document.
+    :return: The JSON document.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
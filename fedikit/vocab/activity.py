@@ -47,6 +47,7 @@ class Activity(Object):
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Activity")
     __default_context__ = Uri("https://www.w3.org/ns/activitystreams")
+    __slots__ = ()
 
     #: Describes one or more entities that either performed or are expected to
     #: perform the activity.  Any single activity can have multiple
@@ -147,6 +148,7 @@ class Accept(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Accept")
+    __slots__ = ()
 
 
 class Add(Activity):
@@ -158,6 +160,7 @@ class Add(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Add")
+    __slots__ = ()
 
 
 class Announce(Activity):
@@ -168,12 +171,14 @@ class Announce(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Announce")
+    __slots__ = ()
 
 
 class Create(Activity):
     """Indicates that the :attr:`actor` has created the :attr:`object`."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Create")
+    __slots__ = ()
 
 
 class Delete(Activity):
@@ -183,12 +188,14 @@ class Delete(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Delete")
+    __slots__ = ()
 
 
 class Dislike(Activity):
     """Indicates that the :attr:`actor` dislikes the :attr:`object`."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Dislike")
+    __slots__ = ()
 
 
 class Flag(Activity):
@@ -198,6 +205,7 @@ class Flag(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Flag")
+    __slots__ = ()
 
 
 class Follow(Activity):
@@ -209,6 +217,7 @@ class Follow(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Follow")
+    __slots__ = ()
 
 
 class Ignore(Activity):
@@ -217,6 +226,7 @@ class Ignore(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Ignore")
+    __slots__ = ()
 
 
 class Block(Ignore):
@@ -228,6 +238,7 @@ class Block(Ignore):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Block")
+    __slots__ = ()
 
 
 class Join(Activity):
@@ -236,6 +247,7 @@ class Join(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Join")
+    __slots__ = ()
 
 
 class Leave(Activity):
@@ -244,6 +256,7 @@ class Leave(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Leave")
+    __slots__ = ()
 
 
 class Like(Activity):
@@ -253,12 +266,14 @@ class Like(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Like")
+    __slots__ = ()
 
 
 class Listen(Activity):
     """Indicates that the :attr:`actor` has listened to the :attr:`object`."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Listen")
+    __slots__ = ()
 
 
 class Move(Activity):
@@ -268,6 +283,7 @@ class Move(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Move")
+    __slots__ = ()
 
 
 class Offer(Activity):
@@ -277,6 +293,7 @@ class Offer(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Offer")
+    __slots__ = ()
 
 
 class Invite(Offer):
@@ -285,6 +302,7 @@ class Invite(Offer):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Invite")
+    __slots__ = ()
 
 
 class Reject(Activity):
@@ -293,12 +311,14 @@ class Reject(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Reject")
+    __slots__ = ()
 
 
 class Read(Activity):
     """Indicates that the :attr:`actor` has read the :attr:`object`."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Read")
+    __slots__ = ()
 
 
 class Remove(Activity):
@@ -308,6 +328,7 @@ class Remove(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Remove")
+    __slots__ = ()
 
 
 class TentativeReject(Reject):
@@ -316,6 +337,7 @@ class TentativeReject(Reject):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#TentativeReject")
+    __slots__ = ()
 
 
 class TentativeAccept(Accept):
@@ -324,6 +346,7 @@ class TentativeAccept(Accept):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#TentativeAccept")
+    __slots__ = ()
 
 
 class Undo(Activity):
@@ -337,6 +360,7 @@ class Undo(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Undo")
+    __slots__ = ()
 
 
 class Update(Activity):
@@ -347,6 +371,10 @@ class Update(Activity):
     The :attr:`target` and :attr:`origin` typically have no defined meaning.
     """
 
+    __slots__ = ()
+
 
 class View(Activity):
     """Indicates that the :attr:`actor` has viewed the object."""
+
+    __slots__ = ()
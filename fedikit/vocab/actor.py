@@ -32,6 +32,7 @@ class Actor(Object):
         Uri("https://www.w3.org/ns/activitystreams"),
         Uri("https://w3id.org/security/v1"),
     ]
+    __slots__ = ()
 
     #: The inbox stream contains all activities received by the actor.
     #: The server *should* filter content according to the requester's
@@ -200,6 +201,7 @@ class Application(Actor):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Application")
+    __slots__ = ()
 
 
 class Group(Actor):
@@ -207,6 +209,7 @@ class Group(Actor):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Group")
+    __slots__ = ()
 
 
 class Organization(Actor):
@@ -214,6 +217,7 @@ class Organization(Actor):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Organization")
+    __slots__ = ()
 
 
 class Person(Actor):
@@ -221,6 +225,7 @@ class Person(Actor):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Person")
+    __slots__ = ()
 
 
 class Service(Actor):
@@ -228,6 +233,7 @@ class Service(Actor):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Service")
+    __slots__ = ()
 
 
 class Endpoints(Entity):
@@ -242,6 +248,7 @@ class Endpoints(Entity):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Endpoints")
+    __slots__ = ()
 
     #: Endpoint URI so this actor's clients may access remote ActivityStreams
     #: objects which require authentication to access.  To use this endpoint,
@@ -310,6 +317,7 @@ class Key(Entity):
 
     __abstract__ = False
     __uri__ = Uri("https://w3id.org/security#Key")
+    __slots__ = ()
 
     #: Provides the globally unique identifier for a :class:`PublicKey`.
     id: Uri = id_property()
@@ -27,6 +27,7 @@ class Collection(Object):
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Collection")
     __default_context__ = Uri("https://www.w3.org/ns/activitystreams")
+    __slots__ = ()
 
     #: A non-negative integer specifying the total number of objects contained
     #: by the logical view of the collection.  This number might not reflect
@@ -67,6 +68,7 @@ class OrderedCollection(Collection):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#OrderedCollection")
+    __slots__ = ()
 
     #: Identifies the items contained in a collection.  The items might be
     #: ordered or unordered.
@@ -93,6 +95,7 @@ class CollectionPage(Collection):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#CollectionPage")
+    __slots__ = ()
 
     #: Identifies the :class:`Collection` to which a :class:`CollectionPage`
     #: objects items belong.
@@ -118,3 +121,5 @@ class OrderedCollectionPage(OrderedCollection, CollectionPage):
 
     __ https://www.w3.org/TR/activitystreams-core/#dfn-orderedcollectionpage
     """
+
+    __slots__ = ()
@@ -9,27 +9,32 @@ class Document(Object):
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Document")
     __default_context__ = Uri("https://www.w3.org/ns/activitystreams")
+    __slots__ = ()
 
 
 class Audio(Document):
     """Represents an audio document of any kind."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Audio")
+    __slots__ = ()
 
 
 class Image(Document):
     """An image document of any kind."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Image")
+    __slots__ = ()
 
 
 class Page(Document):
     """Represents a web page."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Page")
+    __slots__ = ()
 
 
 class Video(Document):
     """Represents a video document of any kind."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Video")
+    __slots__ = ()
@@ -19,6 +19,7 @@ class IntransitiveActivity(Activity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#IntransitiveActivity")
+    __slots__ = ()
 
 
 class Arrive(IntransitiveActivity):
@@ -29,6 +30,7 @@ class Arrive(IntransitiveActivity):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Arrive")
+    __slots__ = ()
 
 
 class Question(IntransitiveActivity):
@@ -42,6 +44,8 @@ class Question(IntransitiveActivity):
     properties.
     """
 
+    __slots__ = ()
+
     #: Identifies an exclusive option for a :class:`Question`.
     #: Use of ``one_of`` implies that the :class:`Question` can have only
     #: a single answer.  To indicate that a :class:`Question` can have multiple
@@ -27,6 +27,7 @@ class Link(Entity):
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Link")
     __default_context__ = Uri("https://www.w3.org/ns/activitystreams")
+    __slots__ = ()
 
     #: Provides the globally unique identifier for an :class:`Link`.
     id: Uri = id_property()
@@ -105,6 +106,7 @@ class Mention(Link):
     """A specialized :class:`Link` that represents an @mention."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Mention")
+    __slots__ = ()
 
 
 from .object import Object  # noqa: E402
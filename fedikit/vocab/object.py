@@ -32,6 +32,7 @@ class Object(Entity):
 
     __abstract__ = False
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Object")
+    __slots__ = ()
     __default_context__: ClassVar[Uri | Sequence[Uri] | Mapping[str, Any]] = (
         Uri("https://www.w3.org/ns/activitystreams")
     )
@@ -415,12 +416,14 @@ class Article(Object):
     """Represents any kind of multi-paragraph written work."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Article")
+    __slots__ = ()
 
 
 class Event(Object):
     """Represents any kind of event."""
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Event")
+    __slots__ = ()
 
 
 class Note(Object):
@@ -429,6 +432,7 @@ class Note(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Note")
+    __slots__ = ()
 
 
 class Place(Object):
@@ -439,6 +443,7 @@ class Place(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Place")
+    __slots__ = ()
 
     #: Indicates the accuracy of position coordinates on a :class:`Place`
     #: objects.  Expressed in properties of percentage. e.g. "94.0" means
@@ -488,6 +493,7 @@ class Profile(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Profile")
+    __slots__ = ()
 
     #: On a :class:`Profile` object, the describes property identifies
     #: the object described by the :class:`Profile`.
@@ -508,6 +514,7 @@ class Relationship(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Relationship")
+    __slots__ = ()
 
     #: On a :class:`Relationship` object, the :attr:`subject` property
     #: identifies one of the connected individuals.  For instance,
@@ -553,6 +560,7 @@ class Tombstone(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Tombstone")
+    __slots__ = ()
 
     #: On a :class:`Tombstone` object, the :attr:`former_type` property
     #: identifies the type of the object that was deleted.
@@ -594,6 +602,7 @@ class Hashtag(Object):
     """
 
     __uri__ = Uri("https://www.w3.org/ns/activitystreams#Hashtag")
+    __slots__ = ()
 
 
 from .collection import Collection  # noqa: E402
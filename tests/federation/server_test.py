@@ -1,14 +1,14 @@
 from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable, Optional, cast
+from typing import Any, Callable, Optional, cast
 
 import pytest
 from asgi_tools.tests import ASGITestClient
 from asgi_tools.types import TASGIApp
 
 from fedikit.federation.collection import Page
-from fedikit.federation.server import Context, Server
+from fedikit.federation.server import Context, Server, send_response
 from fedikit.model.entity import EntityRef
 from fedikit.uri import Uri
 from fedikit.vocab.activity import Activity, Create
@@ -139,6 +139,18 @@ async def test_webfinger(client: ASGITestClient) -> None:
     )
     assert non_existent.status_code == 404
 
+    upper_host = await client.request(
+        "/.well-known/webfinger?resource=acct:alice@FediKit.test",
+        "GET",
+    )
+    assert upper_host.status_code == 200
+
+    trailing_newline = await client.request(
+        "/.well-known/webfinger?resource=acct:alice@fedikit.test%0A",
+        "GET",
+    )
+    assert trailing_newline.status_code == 404
+
     other_host = await client.request(
         "/.well-known/webfinger?resource=acct:alice@other.host",
         "GET",
@@ -152,6 +164,47 @@ async def test_webfinger(client: ASGITestClient) -> None:
     assert non_acct.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_host(client: ASGITestClient) -> None:
+    for host in ["fedikit.test", "other.test", "fedikit.test"]:
+        alice = await client.request(
+            f"/.well-known/webfinger?resource=acct:alice@{host}",
+            "GET",
+            headers={"Host": host},
+        )
+        assert alice.status_code == 200
+        assert await alice.json() == {
+            "subject": f"acct:alice@{host}",
+            "aliases": [f"http://{host}/actors/alice"],
+            "links": [{
+                "rel": "self",
+                "type": "application/activity+json",
+                "href": f"http://{host}/actors/alice",
+            }],
+        }
+
+
+@pytest.mark.asyncio
+async def test_accept(client: ASGITestClient) -> None:
+    path = "/.well-known/webfinger?resource=acct:alice@fedikit.test"
+    for accept in [
+        "application/activity+json",
+        'application/ld+json; profile="https://www.w3.org/ns/activitystreams"',
+        "Application/JSON",
+        "text/html, application/*;q=0.5",
+        "*/*",
+    ]:
+        response = await client.request(
+            path, "GET", headers={"Accept": accept}
+        )
+        assert response.status_code == 200, accept
+    for accept in ["text/html", "text/html, application/json;q=0"]:
+        response = await client.request(
+            path, "GET", headers={"Accept": accept}
+        )
+        assert response.status_code == 406, accept
+
+
 @pytest.mark.asyncio
 async def test_actor_dispatcher(client: ASGITestClient) -> None:
     alice = await client.request("/actors/alice", "GET")
@@ -198,6 +251,28 @@ async def test_actor_dispatcher(client: ASGITestClient) -> None:
     assert non_existent.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_actor_dispatcher_changed_actor() -> None:
+    names: list[str] = []
+    asgi_app = server.asgi(
+        CtxData({"alice": lambda uri: Person(id=uri, name=names[-1])})
+    )
+    client = ASGITestClient(cast(TASGIApp, asgi_app), "http://fedikit.test")
+    client.headers = {"Host": "fedikit.test"}
+    for name in ["Alice", "Alice", "Alicia"]:
+        names.append(name)
+        alice = await client.request("/actors/alice", "GET")
+        assert await alice.json() == {
+            "@context": [
+                "https://www.w3.org/ns/activitystreams",
+                "https://w3id.org/security/v1",
+            ],
+            "id": "http://fedikit.test/actors/alice",
+            "type": "Person",
+            "name": name,
+        }
+
+
 @pytest.mark.asyncio
 async def test_outbox_dispatcher(client: ASGITestClient) -> None:
     alice = await client.request("/actors/alice/outbox", "GET")
@@ -273,4 +348,21 @@ async def test_outbox_first_last_cursor() -> None:
     }
 
 
+@pytest.mark.asyncio
+async def test_send_response() -> None:
+    events: list[Any] = []
+
+    async def send(event: Any) -> None:
+        events.append(event)
+
+    body = b"x" * (1024 * 1024)
+    await send_response(send, 200, [], body)
+    assert events == [
+        {"type": "http.response.start", "status": 200, "headers": []},
+        {"type": "http.response.body", "body": body, "more_body": False},
+    ]
+    # The body is sent as is, without being copied:
+    assert events[1]["body"] is body
+
+
 # cSpell: ignore TASGI
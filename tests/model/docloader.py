@@ -3,9 +3,11 @@ from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
 
-from fedikit.model.docloader import RemoteDocument
+from fedikit.model.docloader import RemoteDocument, non_blocking
 
 
+# Fixtures are small local files, so they are read in the event loop:
+@non_blocking
 def fixture_document_loader(url: str) -> Optional[RemoteDocument]:
     parsed = urlparse(url)
     if parsed.scheme not in ("http", "https"):
@@ -1,14 +1,25 @@
-from typing import Any
+from threading import get_ident
+from typing import Any, Optional
 
 import pytest
+from pyld.jsonld import JsonLdError
 
-from fedikit.model.docloader import DocumentLoader
-from fedikit.model.entity import Entity, EntityRef, load_entity_refs
+from fedikit.model.docloader import (
+    DocumentLoader,
+    RemoteDocument,
+    non_blocking,
+)
+from fedikit.model.entity import (
+    Entity,
+    EntityRef,
+    entity_types,
+    load_entity_refs,
+)
 from fedikit.uri import Uri
 from fedikit.vocab.activity import Activity
 from fedikit.vocab.document import Page
 from fedikit.vocab.link import Link
-from fedikit.vocab.object import Object
+from fedikit.vocab.object import Note, Object
 
 
 @pytest.mark.asyncio
@@ -25,6 +36,155 @@ async def test_entity_from_jsonld(document_loader: DocumentLoader) -> None:
     assert page == Page(name="foo")
 
 
+@pytest.mark.asyncio
+async def test_entity_from_jsonld_context_cache(
+    document_loader: DocumentLoader,
+) -> None:
+    loaded: list[str] = []
+
+    @non_blocking
+    def counting_loader(url: str) -> Optional[RemoteDocument]:
+        loaded.append(url)
+        return document_loader(url)
+
+    for name in ["foo", "bar"]:
+        page = await Entity.__from_jsonld__(
+            {
+                "@context": "https://www.w3.org/ns/activitystreams",
+                "type": "Page",
+                "name": name,
+            },
+            loader=counting_loader,
+        )
+        assert page == Page(name=name)
+    assert loaded.count("https://www.w3.org/ns/activitystreams") == 1
+
+    # Contexts resolved through a loader are not shared with other loaders:
+    @non_blocking
+    def failing_loader(url: str) -> Optional[RemoteDocument]:
+        return None
+
+    with pytest.raises(JsonLdError):
+        await Entity.__from_jsonld__(
+            {
+                "@context": "https://www.w3.org/ns/activitystreams",
+                "type": "Page",
+                "name": "foo",
+            },
+            loader=failing_loader,
+        )
+
+
+@pytest.mark.asyncio
+async def test_entity_jsonld_blocking_loader(
+    document_loader: DocumentLoader,
+) -> None:
+    # A loader not marked by non_blocking() is called in a worker thread,
+    # both when expanding and compacting documents:
+    threads: set[int] = set()
+
+    # Since resolved contexts are cached per loader, each step gets a new
+    # loader, so that it has to load the context by itself:
+    def make_loader() -> DocumentLoader:
+        def blocking_loader(url: str) -> Optional[RemoteDocument]:
+            threads.add(get_ident())
+            return document_loader(url)
+
+        return blocking_loader
+
+    page = await Entity.__from_jsonld__(
+        {
+            "@context": "https://www.w3.org/ns/activitystreams",
+            "type": "Page",
+            "name": "blocking",
+        },
+        loader=make_loader(),
+    )
+    assert page == Page(name="blocking")
+    assert threads and get_ident() not in threads
+    threads.clear()
+    page = Page(name="blocking compacted")
+    assert await page.__jsonld__(loader=make_loader()) == {
+        "@context": "https://www.w3.org/ns/activitystreams",
+        "type": "Page",
+        "name": "blocking compacted",
+    }
+    assert threads and get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_entity_jsonld_cache(document_loader: DocumentLoader) -> None:
+    page = Page(name="foo")
+    doc = await page.__jsonld__(loader=document_loader)
+    assert doc == {
+        "@context": "https://www.w3.org/ns/activitystreams",
+        "type": "Page",
+        "name": "foo",
+    }
+    assert isinstance(doc, dict)
+    doc["name"] = "bar"
+    assert await page.__jsonld__(loader=document_loader) == {
+        "@context": "https://www.w3.org/ns/activitystreams",
+        "type": "Page",
+        "name": "foo",
+    }
+
+
+@pytest.mark.asyncio
+async def test_entity_from_jsonld_without_context() -> None:
+    # A document without a context is still expanded, e.g., plain strings
+    # become value objects:
+    page = await Entity.__from_jsonld__({
+        "@type": ["https://www.w3.org/ns/activitystreams#Page"],
+        "https://www.w3.org/ns/activitystreams#name": ["foo"],
+    })
+    assert page == Page(name="foo")
+
+
+@pytest.mark.asyncio
+async def test_entity_from_jsonld_override(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Embedded entities are parsed through __from_jsonld__() as well, so that
+    # subclasses overriding it are not bypassed:
+    calls: list[bool] = []
+    from_jsonld = Note.__from_jsonld__
+
+    async def override(
+        cls: type[Note],
+        document: Any,
+        loader: Optional[DocumentLoader] = None,
+        *,
+        expanded: bool = False,
+    ) -> Note:
+        calls.append(expanded)
+        return await from_jsonld(document, loader, expanded=expanded)
+
+    monkeypatch.setattr(Note, "__from_jsonld__", classmethod(override))
+    activity = await Entity.__from_jsonld__({
+        "@type": ["https://www.w3.org/ns/activitystreams#Create"],
+        "https://www.w3.org/ns/activitystreams#object": [
+            {
+                "@type": ["https://www.w3.org/ns/activitystreams#Note"],
+                "https://www.w3.org/ns/activitystreams#content": ["foo"],
+            },
+        ],
+    })
+    assert isinstance(activity, Activity)
+    assert activity.object == Note(content="foo")
+    assert calls == [True]
+
+
+def test_entity_slots() -> None:
+    # Entities keep their values in slots, so none of the vocabulary types
+    # (all registered by importing fedikit.vocab) may give their instances
+    # a __dict__:
+    for entity_type in set(entity_types.values()):
+        assert not any(
+            "__dict__" in vars(cls) for cls in entity_type.__mro__
+        ), entity_type
+
+
 def test_entity_ref_uri():
     assert EntityRef("https://example.com/").uri == Uri("https://example.com/")
 
@@ -89,7 +249,11 @@ async def test_load_entity_refs(document_loader: DocumentLoader) -> None:
     )
     assert act.attachment == EntityRef("https://example.com/foo")
     assert act.object == EntityRef("https://example.com/bar")
+    hash(act)  # The hash must be computed again once references are loaded
     await load_entity_refs(act, "attachment", loader=document_loader)
+    assert hash(act) == hash(
+        Activity(attachment=act.attachment, object=act.object)
+    )
     assert act.attachment == Object(
         name="foo",
         attachments=[